@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 import sys
 import os
+from datetime import date
 from scipy import stats
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -28,24 +29,25 @@ from src.device_endpoints import (
     get_device_events_by_type,
     get_device_recalls_by_class
 )
+from src.components import current_controls
 
-@st.cache_data(ttl=3600)
-def get_cross_category_recalls():
+@st.cache_data(ttl=3600, max_entries=32)
+def get_cross_category_recalls(start_date: date, end_date: date):
     drug_recalls = get_drug_manufacturer_distribution(
-        st.session_state.start_date,
-        st.session_state.end_date,
+        start_date,
+        end_date,
         100
     )
 
     food_recalls = get_food_recalls_by_classification(
-        st.session_state.start_date,
-        st.session_state.end_date,
+        start_date,
+        end_date,
         100
     )
 
     device_recalls = get_device_recalls_by_class(
-        st.session_state.start_date,
-        st.session_state.end_date,
+        start_date,
+        end_date,
         100
     )
 
@@ -85,12 +87,12 @@ def get_cross_category_recalls():
 
     return recalls_df
 
-@st.cache_data(ttl=3600)
-def get_demographic_vs_adverse_events():
+@st.cache_data(ttl=3600, max_entries=32)
+def get_demographic_vs_adverse_events(start_date: date, end_date: date):
     # Gets demographic data
     age_data = adverse_events_by_patient_age_group_within_data_range(
-        st.session_state.start_date.strftime('%Y-%m-%d'),
-        st.session_state.end_date.strftime('%Y-%m-%d')
+        start_date.isoformat(),
+        end_date.isoformat()
     )
 
     # Extracts age data
@@ -100,8 +102,8 @@ def get_demographic_vs_adverse_events():
         age_data = pd.DataFrame()
 
     sex_data = get_drug_events_by_patient_sex(
-        st.session_state.start_date,
-        st.session_state.end_date
+        start_date,
+        end_date
     )
 
     # Extracts sex data
@@ -120,8 +122,8 @@ def get_demographic_vs_adverse_events():
 
     # Gets adverse reaction data
     reaction_data = get_top_drug_reactions(
-        st.session_state.start_date,
-        st.session_state.end_date
+        start_date,
+        end_date
     )
 
     # Extracts reaction data
@@ -140,23 +142,23 @@ def get_demographic_vs_adverse_events():
 
     return results
 
-@st.cache_data(ttl=3600)
-def analyze_health_effects_across_categories():
+@st.cache_data(ttl=3600, max_entries=32)
+def analyze_health_effects_across_categories(start_date: date, end_date: date):
     drug_reactions = get_top_drug_reactions(
-        st.session_state.start_date,
-        st.session_state.end_date,
+        start_date,
+        end_date,
         50
     )
 
     tobacco_effects = get_tobacco_reports_by_health_effect(
-        st.session_state.start_date,
-        st.session_state.end_date,
+        start_date,
+        end_date,
         50
     )
 
     food_symptoms = get_food_events_by_symptom(
-        st.session_state.start_date,
-        st.session_state.end_date,
+        start_date,
+        end_date,
         50
     )
 
@@ -175,26 +177,26 @@ def analyze_health_effects_across_categories():
 
     return health_effects
 
-@st.cache_data(ttl=3600)
-def get_product_vs_problem_correlation():
+@st.cache_data(ttl=3600, max_entries=32)
+def get_product_vs_problem_correlation(start_date: date, end_date: date):
     tobacco_products = get_tobacco_reports_by_product(
-        st.session_state.start_date,
-        st.session_state.end_date
+        start_date,
+        end_date
     )
 
     tobacco_problems = get_tobacco_reports_by_problem_type(
-        st.session_state.start_date,
-        st.session_state.end_date
+        start_date,
+        end_date
     )
 
     device_types = get_device_events_by_type(
-        st.session_state.start_date,
-        st.session_state.end_date
+        start_date,
+        end_date
     )
 
     device_problems = get_device_events_by_medical_specialty(
-        st.session_state.start_date,
-        st.session_state.end_date
+        start_date,
+        end_date
     )
 
     # Process data for correlation analysis
@@ -238,6 +240,11 @@ def calculate_correlation_between_categories(df1, df2, col1, col2):
 def display_correlation_analysis():
     st.title("Correlation Analysis")
 
+    # The loaders take the dates as arguments so they are part of the cache key, reading session
+    # state inside them kept serving the first date range's results. They use no other setting,
+    # so changing the sample size or top results doesn't refetch them
+    controls = current_controls()
+
     st.write("""
     This section analyzes correlations between different FDA data points to identify patterns and relationships
     that might not be apparent when looking at individual categories.
@@ -257,7 +264,7 @@ def display_correlation_analysis():
 
         try:
             with st.spinner("Loading cross-category recall data..."):
-                recalls_df = get_cross_category_recalls()
+                recalls_df = get_cross_category_recalls(controls.start_date, controls.end_date)
 
                 if recalls_df.empty or recalls_df["Recall Count"].sum() == 0:
                     st.warning("No recall data available for the selected time period.")
@@ -317,7 +324,7 @@ def display_correlation_analysis():
 
         try:
             with st.spinner("Loading demographic and adverse event data..."):
-                demo_vs_events = get_demographic_vs_adverse_events()
+                demo_vs_events = get_demographic_vs_adverse_events(controls.start_date, controls.end_date)
 
                 if all(df.empty for df in demo_vs_events.values()):
                     st.warning("No demographic or adverse event data available for the selected time period.")
@@ -390,7 +397,7 @@ def display_correlation_analysis():
 
         try:
             with st.spinner("Loading health effects data..."):
-                health_effects = analyze_health_effects_across_categories()
+                health_effects = analyze_health_effects_across_categories(controls.start_date, controls.end_date)
 
                 if all(df.empty for df in health_effects.values()):
                     st.warning("No health effects data available across categories.")
@@ -520,7 +527,7 @@ def display_correlation_analysis():
 
         try:
             with st.spinner("Loading product and problem data..."):
-                product_problem_data = get_product_vs_problem_correlation()
+                product_problem_data = get_product_vs_problem_correlation(controls.start_date, controls.end_date)
 
                 if all(df.empty for df in product_problem_data.values()):
                     st.warning("No product or problem data available.")
@@ -1,10 +1,9 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import google.generativeai as genai
-import os
 from dotenv import load_dotenv
 from src.data_loader import fetch_api_data
+from src.gemini import get_gemini_model
 from src.device_events import (
     device_class_distribution,
     device_problems_by_year,
@@ -13,15 +12,22 @@ from src.device_events import (
 )
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str = None) -> str:
-    model = genai.GenerativeModel("gemini-1.5-flash")
+    model = get_gemini_model()
+    if model is None:
+        return "No data available for insights or API key not configured."
+    if df.empty:
+        return "No data available for insights."
+
+    # The first rows and per-column statistics instead of the whole frame keep the prompt short
+    summary = df.head(10).to_string(index=False) + "\n\nSummary:\n" + df.describe(include="all").to_string()
+
     if custom_question:
         prompt = f"""
         Based on the following data about {context}:
 
-        {df.to_string()}
+        {summary}
 
         Answer the following question in 5-7 sentences, focusing on data-driven insights and potential implications:
         {custom_question}
@@ -30,7 +36,7 @@ def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str
         prompt = f"""
         Analyze the following data about {context}:
 
-        {df.to_string()}
+        {summary}
 
         Provide a comprehensive analysis in 5-7 sentences, focusing on:
         1. Key trends and patterns
@@ -49,8 +55,8 @@ def display_device_class_distribution():
     st.subheader("Device Class Distribution")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = device_class_distribution()
@@ -93,8 +99,8 @@ def display_device_problems():
     st.subheader("Device Problems")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = device_problems_by_year(st.session_state.start_date.year, st.session_state.end_date.year)
@@ -137,8 +143,8 @@ def display_manufacturer_analysis():
     st.subheader("Manufacturer Analysis")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = device_manufacturer_analysis()
@@ -182,8 +188,8 @@ def display_device_events_by_age():
     st.subheader("Device Events by Age")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = get_device_events_by_age()
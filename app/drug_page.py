@@ -1,11 +1,10 @@
 import streamlit as st
 import pandas as pd
-import google.generativeai as genai
-import os
 from dotenv import load_dotenv
 import plotly.express as px
 import plotly.graph_objects as go
 
+from src.gemini import get_gemini_model
 from src.drug_events import (
     adverse_events_by_patient_age_group_within_data_range,
     adverse_events_by_drug_within_data_range,
@@ -21,9 +20,12 @@ from src.drug_events import (
 )
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 def get_insights_from_data(df, context: str, custom_question: str = None) -> str:
+    model = get_gemini_model()
+    if model is None:
+        return "No data available for insights or API key not configured."
+
     # Handle empty data
     if df is None:
         return "No data available for insights."
@@ -66,7 +68,6 @@ def get_insights_from_data(df, context: str, custom_question: str = None) -> str
 
     # Generate insights
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
         response = model.generate_content(prompt)
         return response.text
     except Exception as e:
@@ -83,8 +84,8 @@ def display_adverse_events_by_age():
     st.subheader("Adverse Events by Age Group")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = adverse_events_by_patient_age_group_within_data_range(start_str, end_str)
@@ -126,8 +127,8 @@ def display_adverse_events_by_drug():
     st.subheader("Adverse Events by Drug")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = adverse_events_by_drug_within_data_range(start_str, end_str)
@@ -170,8 +171,8 @@ def display_global_adverse_events():
     st.subheader("Global Adverse Events Distribution")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = adverse_events_by_country()
@@ -215,8 +216,8 @@ def display_actions_taken_with_drug():
     st.subheader("Actions Taken with Drug")
 
     # global date range from session state
-    start_str = st.session_state.start_date.strftime('%Y-%m-%d')
-    end_str = st.session_state.end_date.strftime('%Y-%m-%d')
+    start_str = st.session_state.start_date.isoformat()
+    end_str = st.session_state.end_date.isoformat()
 
     # Fetch and process data
     df = get_actions_taken_with_drug()
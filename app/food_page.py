@@ -1,15 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, date
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.gemini import get_gemini_model
 from src.food_endpoints import (
     get_food_recalls_by_classification,
     get_food_recalls_by_reason,
@@ -24,17 +23,60 @@ from src.food_endpoints import (
     get_food_recall_trends
 )
 
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+
+# Prefetch
+# Endpoints that only depend on the global date range and sample size
+_PREFETCH_FETCHERS = (
+    get_food_recalls_by_classification,
+    get_food_recalls_by_reason,
+    get_food_recalls_by_state,
+    get_food_recalls_by_product_type,
+    get_food_events_by_industry,
+    get_food_events_by_product,
+    get_food_events_by_symptom,
+    get_food_events_by_age,
+    get_food_events_by_outcome
+)
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=8)
+
+def prefetch_food_data(start_date, end_date, sample_size):
+    """Warm the cached food endpoints concurrently so a cold page waits on the slowest call, not the sum.
+    Runs once per session for each set of controls, later reruns only render the selected view"""
+    prefetch_key = (start_date, end_date, sample_size)
+    if st.session_state.get("_food_prefetched") == prefetch_key:
+        return
+
+    futures = [
+        _PREFETCH_POOL.submit(fetcher, start_date, end_date, sample_size)
+        for fetcher in _PREFETCH_FETCHERS
+    ]
+    wait(futures)
+    st.session_state._food_prefetched = prefetch_key
+
+# Charts
+# Config for plain count panels that only need to be looked at, skips Plotly.js interaction setup.
+# Charts with hover data stay interactive, static mode would hide their tooltips
+_STATIC_CHART_CONFIG = {"staticPlot": True, "displayModeBar": False}
+
+@lru_cache(maxsize=None)
+def _chart_template():
+    """Resolve the shared plotly_white template once instead of on every px call"""
+    import plotly.io as pio
+
+    return pio.templates["plotly_white"]
+
 # Gemini
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+if not GEMINI_API_KEY:
     st.warning("Gemini API key not found. AI insights will not be available.")
 
 def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str = None) -> str:
     """Generate AI insights from data using Gemini"""
-    if not GEMINI_API_KEY or df.empty:
+    model = get_gemini_model()
+    if model is None or df.empty:
         return "No data available for insights or API key not configured."
 
     # Determine the DataFrame to use for dictionary-type results
@@ -66,7 +108,6 @@ def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str
         )
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
         response = model.generate_content(prompt)
         return response.text
     except Exception as e:
@@ -81,6 +122,8 @@ def render_ai_insights_section(df, context, key_prefix):
             st.write(insights)
 
 def display_food_recall_classification():
+    import plotly.express as px
+
     st.subheader("Food Recalls by Classification")
 
     # global date range from session state
@@ -100,6 +143,7 @@ def display_food_recall_classification():
         # Bar chart
         fig_bar = px.bar(
             df,
+            template=_chart_template(),
             x="Classification",
             y="Count",
             title="Food Recalls by Classification",
@@ -109,12 +153,13 @@ def display_food_recall_classification():
         )
         fig_bar.update_layout(xaxis_tickangle=0)
         fig_bar.update_traces(textposition='outside')
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(fig_bar, use_container_width=True, theme=None)
 
     with col2:
         # Pie chart
         fig_pie = px.pie(
             df,
+            template=_chart_template(),
             values="Count",
             names="Classification",
             title="Distribution of Food Recalls by Classification",
@@ -122,7 +167,7 @@ def display_food_recall_classification():
             hover_data=["Description"]
         )
         fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(fig_pie, use_container_width=True, theme=None)
 
     # Description table
     st.subheader("Classification Descriptions")
@@ -132,6 +177,8 @@ def display_food_recall_classification():
 
 def display_food_recall_reason():
     """Display food recalls by reason"""
+    import plotly.express as px
+
     st.subheader("Food Recalls by Reason")
 
     # global date range from session state
@@ -143,7 +190,8 @@ def display_food_recall_reason():
 
     if isinstance(result_df, dict) and "categorized" in result_df and not result_df["categorized"].empty:
         category_df = result_df["categorized"]
-        detailed_df = result_df["detailed"]
+        # Categorical keys let the groupbys below hash integer codes instead of strings
+        detailed_df = result_df["detailed"].astype({"Category": "category", "Reason": "category"})
 
         # Create visualizations
         col1, col2 = st.columns(2)
@@ -152,6 +200,7 @@ def display_food_recall_reason():
             # Bar chart for categories
             fig_bar = px.bar(
                 category_df,
+                template=_chart_template(),
                 x="Category",
                 y="Count",
                 title="Food Recalls by Reason Category",
@@ -160,45 +209,53 @@ def display_food_recall_reason():
             )
             fig_bar.update_layout(xaxis_tickangle=0)
             fig_bar.update_traces(textposition='outside')
-            st.plotly_chart(fig_bar, use_container_width=True)
+            st.plotly_chart(fig_bar, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
 
         with col2:
             # Pie chart for categories
             fig_pie = px.pie(
                 category_df,
+                template=_chart_template(),
                 values="Count",
                 names="Category",
                 title="Distribution of Food Recalls by Reason Category",
                 hole=0.4
             )
             fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_pie, use_container_width=True)
+            st.plotly_chart(fig_pie, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
 
         # Show top specific reasons within each category
         st.subheader("Top Specific Reasons by Category")
 
         # Get selected categories
+        categories = category_df["Category"].unique().tolist()
         selected_categories = st.multiselect(
             "Select Categories to Explore",
-            options=category_df["Category"].unique(),
-            default=list(category_df["Category"].unique())[:2]  # Default to first two categories
+            options=categories,
+            default=categories[:2]  # Default to first two categories
         )
 
         if selected_categories:
-            filtered_df = detailed_df[detailed_df["Category"].isin(selected_categories)]
+            # Match on the integer category codes rather than comparing strings row by row
+            category_codes = detailed_df["Category"].cat.categories.get_indexer(selected_categories)
+            mask = np.isin(detailed_df["Category"].cat.codes.to_numpy(), category_codes[category_codes >= 0])
+            filtered_df = detailed_df[mask]
 
             # Group, sort, and limit to top reasons per category
-            top_reasons = (filtered_df.groupby(["Category", "Reason"])
+            top_reasons = (filtered_df.groupby(["Category", "Reason"], observed=True)
                           .sum()
                           .reset_index()
                           .sort_values(["Category", "Count"], ascending=[True, False]))
 
             # Get top N reasons per category
             top_n = st.slider("Number of top reasons per category", 3, 10, 5)
+            # Sliced once for both the chart and the table, already ordered by Category then Count
+            top_slice = top_reasons.groupby("Category", sort=False, observed=True).head(top_n)
 
             # Create a figure for top reasons by category
             fig_reasons = px.bar(
-                top_reasons.groupby("Category").head(top_n),
+                top_slice,
+                template=_chart_template(),
                 y="Reason",
                 x="Count",
                 color="Category",
@@ -230,21 +287,19 @@ def display_food_recall_reason():
                     # Add hovertext showing full reason text
                     fig_reasons.data[i].hovertemplate = '%{y}<br>Count: %{x}<extra></extra>'
 
-            st.plotly_chart(fig_reasons, use_container_width=True)
+            st.plotly_chart(fig_reasons, use_container_width=True, theme=None)
 
             # Aclean table view for reference
             with st.expander("View detailed reason data", expanded=False):
-                st.dataframe(
-                    top_reasons.groupby("Category").head(top_n)[["Category", "Reason", "Count"]]
-                    .sort_values(["Category", "Count"], ascending=[True, False]),
-                    use_container_width=True
-                )
+                st.dataframe(top_slice[["Category", "Reason", "Count"]], use_container_width=True)
 
         render_ai_insights_section(result_df, "food recall reasons", "recall_reason")
     else:
         st.warning("No data available for the selected date range.")
 
 def display_food_recall_geography():
+    import plotly.express as px
+
     st.subheader("Food Recalls by Geography")
 
     # global date range from session state
@@ -280,6 +335,7 @@ def display_food_recall_geography():
     # choropleth map
     fig_map = px.choropleth(
         df,
+        template=_chart_template(),
         locations="State",
         locationmode="USA-states",
         color="Count",
@@ -289,7 +345,7 @@ def display_food_recall_geography():
         color_continuous_scale=px.colors.sequential.Viridis,
         title="Food Recalls by State"
     )
-    st.plotly_chart(fig_map, use_container_width=True)
+    st.plotly_chart(fig_map, use_container_width=True, theme=None)
 
     # Bar chart for top states
     top_n = min(st.session_state.top_n_results, len(df))
@@ -297,6 +353,7 @@ def display_food_recall_geography():
 
     fig_bar = px.bar(
         top_states_df,
+        template=_chart_template(),
         x="State Name",  # Use full state names
         y="Count",
         title=f"Top {top_n} States by Food Recalls",
@@ -306,7 +363,7 @@ def display_food_recall_geography():
     )
     fig_bar.update_layout(xaxis_tickangle=-45)
     fig_bar.update_traces(textposition='outside')
-    st.plotly_chart(fig_bar, use_container_width=True)
+    st.plotly_chart(fig_bar, use_container_width=True, theme=None)
 
     # Show full data table
     with st.expander("View Full Data Table"):
@@ -316,6 +373,8 @@ def display_food_recall_geography():
     render_ai_insights_section(df, "food recall geographical distribution", "recall_geo")
 
 def display_food_recall_product():
+    import plotly.express as px
+
     st.subheader("Food Recalls by Product Type")
 
     # global date range from session state
@@ -335,6 +394,7 @@ def display_food_recall_product():
         # Bar chart
         fig_bar = px.bar(
             df,
+            template=_chart_template(),
             x="Product Category",
             y="Count",
             title="Food Recalls by Product Category",
@@ -343,303 +403,345 @@ def display_food_recall_product():
         )
         fig_bar.update_layout(xaxis_tickangle=0)
         fig_bar.update_traces(textposition='outside')
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(fig_bar, use_container_width=True, theme=None)
 
     with col2:
         # Treemap visualization
         fig_treemap = px.treemap(
             df,
+            template=_chart_template(),
             path=["Product Category"],
             values="Count",
             title="Hierarchy of Product Categories"
         )
-        st.plotly_chart(fig_treemap, use_container_width=True)
+        st.plotly_chart(fig_treemap, use_container_width=True, theme=None)
 
     with st.expander("View Product Category Data", expanded=False):
         st.dataframe(df, use_container_width=True, hide_index=True)
 
     render_ai_insights_section(df, "food recall product categories", "recall_product")
 
-def display_food_adverse_events():
-    st.subheader("Food Adverse Events Analysis")
+@st.fragment
+def _food_industry_fragment(industry_df):
+    """Top-N industries panel, reruns on its own when the slider moves"""
+    import plotly.express as px
 
-    event_tabs = st.tabs([
-        "By Industry",
-        "By Product",
-        "By Symptom",
-        "By Age",
-        "By Outcome"
-    ])
+    # Top industries slider
+    top_n = st.slider("Number of top industries to show", 5, 20, 10, key="food_industry_slider")
+    top_industry_df = industry_df.head(top_n)
 
-    # By Industry
-    with event_tabs[0]:
-        st.subheader("Adverse Events by Food Industry")
+    col1, col2 = st.columns(2)
 
-        industry_df = get_food_events_by_industry(
-            st.session_state.start_date,
-            st.session_state.end_date,
-            st.session_state.sample_size
+    with col1:
+        # Bar chart
+        fig_industry = px.bar(
+            top_industry_df,
+            template=_chart_template(),
+            y="Industry",
+            x="Count",
+            title=f"Top {top_n} Food Industries with Adverse Events",
+            orientation='h',
+            color="Industry"
         )
+        fig_industry.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
+        st.plotly_chart(fig_industry, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
 
-        if industry_df.empty:
-            st.warning("No industry data available.")
-        else:
-            # Top industries slider
-            top_n = st.slider("Number of top industries to show", 5, 20, 10, key="food_industry_slider")
-            top_industry_df = industry_df.head(top_n)
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                # Bar chart
-                fig_industry = px.bar(
-                    top_industry_df,
-                    y="Industry",
-                    x="Count",
-                    title=f"Top {top_n} Food Industries with Adverse Events",
-                    orientation='h',
-                    color="Industry"
-                )
-                fig_industry.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
-                st.plotly_chart(fig_industry, use_container_width=True)
-
-            with col2:
-                # Pie chart
-                fig_pie = px.pie(
-                    top_industry_df,
-                    values="Count",
-                    names="Industry",
-                    title="Distribution by Industry"
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
-
-            # Show data table
-            with st.expander("View Full Industry Data", expanded=False):
-                st.dataframe(industry_df, use_container_width=True)
-
-            render_ai_insights_section(industry_df, "food industries involved in adverse events", "food_industry")
-
-    # By Product
-    with event_tabs[1]:
-        st.subheader("Adverse Events by Product")
-
-        product_df = get_food_events_by_product(
-            st.session_state.start_date,
-            st.session_state.end_date,
-            st.session_state.sample_size
+    with col2:
+        # Pie chart
+        fig_pie = px.pie(
+            top_industry_df,
+            template=_chart_template(),
+            values="Count",
+            names="Industry",
+            title="Distribution by Industry"
         )
+        st.plotly_chart(fig_pie, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
 
-        if product_df.empty:
-            st.warning("No product data available.")
-        else:
-            # Top products slider
-            top_n = st.slider("Number of top products to show", 5, 20, 10, key="food_product_slider")
-            top_product_df = product_df.head(top_n)
+    # Show data table
+    with st.expander("View Full Industry Data", expanded=False):
+        st.dataframe(industry_df, use_container_width=True)
 
-            fig_product = px.bar(
-                top_product_df,
-                y="Product",
-                x="Count",
-                title=f"Top {top_n} Products with Adverse Events",
-                orientation='h',
-                color="Product"
-            )
-            fig_product.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig_product, use_container_width=True)
+def display_food_events_by_industry():
+    st.subheader("Adverse Events by Food Industry")
 
-            # Word cloud option if available
-            st.subheader("Search Products")
-            search_term = st.text_input("Filter by product name", key="food_product_search")
+    industry_df = get_food_events_by_industry(
+        st.session_state.start_date,
+        st.session_state.end_date,
+        st.session_state.sample_size
+    )
 
-            if search_term:
-                filtered_products = product_df[product_df["Product"].str.contains(search_term, case=False)]
-                with st.expander("View Filtered Products", expanded=False):
-                    st.dataframe(filtered_products, use_container_width=True)
-            else:
-                with st.expander("View Top Products Data", expanded=False):
-                    st.dataframe(top_product_df, use_container_width=True)
+    if industry_df.empty:
+        st.warning("No industry data available.")
+    else:
+        _food_industry_fragment(industry_df)
+
+        render_ai_insights_section(industry_df, "food industries involved in adverse events", "food_industry")
+
+@st.fragment
+def _food_product_fragment(product_df):
+    """Top-N products panel, reruns on its own when the slider moves"""
+    import plotly.express as px
+
+    # Top products slider
+    top_n = st.slider("Number of top products to show", 5, 20, 10, key="food_product_slider")
+    top_product_df = product_df.head(top_n)
+
+    fig_product = px.bar(
+        top_product_df,
+        template=_chart_template(),
+        y="Product",
+        x="Count",
+        title=f"Top {top_n} Products with Adverse Events",
+        orientation='h',
+        color="Product"
+    )
+    fig_product.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
+    st.plotly_chart(fig_product, use_container_width=True, theme=None)
 
-            render_ai_insights_section(product_df, "products involved in food adverse events", "food_product_insights")
+    # Word cloud option if available
+    st.subheader("Search Products")
+    search_term = st.text_input("Filter by product name", key="food_product_search")
 
-    # By Symptom
-    with event_tabs[2]:
-        st.subheader("Adverse Events by Symptom")
+    if search_term:
+        filtered_products = product_df[product_df["Product"].str.contains(search_term, case=False, regex=False, na=False)]
+        with st.expander("View Filtered Products", expanded=False):
+            st.dataframe(filtered_products, use_container_width=True)
+    else:
+        with st.expander("View Top Products Data", expanded=False):
+            st.dataframe(top_product_df, use_container_width=True)
 
-        symptom_result = get_food_events_by_symptom(
-            st.session_state.start_date,
-            st.session_state.end_date,
-            st.session_state.sample_size
-        )
+def display_food_events_by_product():
+    st.subheader("Adverse Events by Product")
 
-        if isinstance(symptom_result, dict) and "categorized" in symptom_result and not symptom_result["categorized"].empty:
-            category_df = symptom_result["categorized"]
-            detailed_df = symptom_result["detailed"]
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                # Bar chart for categories
-                fig_bar = px.bar(
-                    category_df,
-                    y="Category",
-                    x="Count",
-                    title="Symptoms by Category",
-                    orientation='h',
-                    color="Category"
-                )
-                fig_bar.update_layout(yaxis={'categoryorder':'total ascending'})
-                st.plotly_chart(fig_bar, use_container_width=True)
-
-            with col2:
-                # Pie chart for categories
-                fig_pie = px.pie(
-                    category_df,
-                    values="Count",
-                    names="Category",
-                    title="Distribution of Symptoms by Category"
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
-
-            # Show top specific symptoms within selected category
-            st.subheader("Explore Symptoms by Category")
-            selected_category = st.selectbox(
-                "Select Category to See Detailed Symptoms",
-                options=category_df["Category"].unique(),
-                key="food_symptom_category"
-            )
+    product_df = get_food_events_by_product(
+        st.session_state.start_date,
+        st.session_state.end_date,
+        st.session_state.sample_size
+    )
 
-            if selected_category:
-                filtered_symptoms = detailed_df[detailed_df["Category"] == selected_category]
-                top_symptoms = filtered_symptoms.sort_values("Count", ascending=False).head(10)
-
-                fig_top_symptoms = px.bar(
-                    top_symptoms,
-                    y="Symptom",
-                    x="Count",
-                    title=f"Top Symptoms in {selected_category} Category",
-                    orientation='h',
-                    color="Symptom"
-                )
-                fig_top_symptoms.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
-                st.plotly_chart(fig_top_symptoms, use_container_width=True)
-
-            render_ai_insights_section(symptom_result, "symptoms in food adverse events", "food_symptom_insights")
-        else:
-            st.warning("No symptom data available.")
+    if product_df.empty:
+        st.warning("No product data available.")
+    else:
+        _food_product_fragment(product_df)
 
-    # By Age
-    with event_tabs[3]:
-        st.subheader("Adverse Events by Consumer Age")
+        render_ai_insights_section(product_df, "products involved in food adverse events", "food_product_insights")
 
-        age_df = get_food_events_by_age(
-            st.session_state.start_date,
-            st.session_state.end_date,
-            st.session_state.sample_size
-        )
+def display_food_events_by_symptom():
+    import plotly.express as px
 
-        if age_df.empty:
-            st.warning("No age data available.")
-        else:
-            fig_age = px.bar(
-                age_df,
-                x="Age Group",
-                y="Count",
-                title="Food Adverse Events by Consumer Age Group",
-                color="Age Group"
+    st.subheader("Adverse Events by Symptom")
+
+    symptom_result = get_food_events_by_symptom(
+        st.session_state.start_date,
+        st.session_state.end_date,
+        st.session_state.sample_size
+    )
+
+    if isinstance(symptom_result, dict) and "categorized" in symptom_result and not symptom_result["categorized"].empty:
+        category_df = symptom_result["categorized"]
+        detailed_df = symptom_result["detailed"].astype({"Category": "category"})
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            # Bar chart for categories
+            fig_bar = px.bar(
+                category_df,
+                template=_chart_template(),
+                y="Category",
+                x="Count",
+                title="Symptoms by Category",
+                orientation='h',
+                color="Category"
             )
-            st.plotly_chart(fig_age, use_container_width=True)
+            fig_bar.update_layout(yaxis={'categoryorder':'total ascending'})
+            st.plotly_chart(fig_bar, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
 
-            # Pie chart
+        with col2:
+            # Pie chart for categories
             fig_pie = px.pie(
-                age_df,
+                category_df,
+                template=_chart_template(),
                 values="Count",
-                names="Age Group",
-                title="Distribution by Age Group"
+                names="Category",
+                title="Distribution of Symptoms by Category"
             )
-            st.plotly_chart(fig_pie, use_container_width=True)
+            st.plotly_chart(fig_pie, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
+
+        # Show top specific symptoms within selected category
+        st.subheader("Explore Symptoms by Category")
+        categories = category_df["Category"].unique().tolist()
+        selected_category = st.selectbox(
+            "Select Category to See Detailed Symptoms",
+            options=categories,
+            key="food_symptom_category"
+        )
 
-            st.dataframe(age_df, use_container_width=True)
+        if selected_category:
+            filtered_symptoms = detailed_df[detailed_df["Category"] == selected_category]
+            top_symptoms = filtered_symptoms.sort_values("Count", ascending=False).head(10)
 
-            render_ai_insights_section(age_df, "age distribution in food adverse events", "food_age_insights")
+            fig_top_symptoms = px.bar(
+                top_symptoms,
+                template=_chart_template(),
+                y="Symptom",
+                x="Count",
+                title=f"Top Symptoms in {selected_category} Category",
+                orientation='h',
+                color="Symptom"
+            )
+            fig_top_symptoms.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
+            st.plotly_chart(fig_top_symptoms, use_container_width=True, theme=None)
 
-    # By Outcome
-    with event_tabs[4]:
-        st.subheader("Adverse Events by Outcome")
+        render_ai_insights_section(symptom_result, "symptoms in food adverse events", "food_symptom_insights")
+    else:
+        st.warning("No symptom data available.")
 
-        outcome_df = get_food_events_by_outcome(
-            st.session_state.start_date,
-            st.session_state.end_date,
-            st.session_state.sample_size
+def display_food_events_by_age():
+    import plotly.express as px
+
+    st.subheader("Adverse Events by Consumer Age")
+
+    age_df = get_food_events_by_age(
+        st.session_state.start_date,
+        st.session_state.end_date,
+        st.session_state.sample_size
+    )
+
+    if age_df.empty:
+        st.warning("No age data available.")
+    else:
+        fig_age = px.bar(
+            age_df,
+            template=_chart_template(),
+            x="Age Group",
+            y="Count",
+            title="Food Adverse Events by Consumer Age Group",
+            color="Age Group"
         )
+        st.plotly_chart(fig_age, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
 
-        if outcome_df.empty:
-            st.warning("No outcome data available.")
-        else:
-            # Top outcomes to show
-            top_n = st.slider("Number of top outcomes to show", 5, 15, 10, key="food_outcome_slider")
-            top_outcome_df = outcome_df.head(top_n)
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                # Bar chart
-                fig_bar = px.bar(
-                    top_outcome_df,
-                    y="Outcome",
-                    x="Count",
-                    title=f"Top {top_n} Adverse Event Outcomes",
-                    orientation='h',
-                    color="Outcome"
-                )
-                fig_bar.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
-                st.plotly_chart(fig_bar, use_container_width=True)
-
-            with col2:
-                # Pie chart
-                fig_pie = px.pie(
-                    top_outcome_df,
-                    values="Count",
-                    names="Outcome",
-                    title="Distribution of Adverse Event Outcomes"
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
-
-            with st.expander("View Full Outcome Data", expanded=False):
-                st.dataframe(outcome_df, use_container_width=True)
-
-            render_ai_insights_section(outcome_df, "outcomes of food adverse events", "food_outcome_insights")
+        # Pie chart
+        fig_pie = px.pie(
+            age_df,
+            template=_chart_template(),
+            values="Count",
+            names="Age Group",
+            title="Distribution by Age Group"
+        )
+        st.plotly_chart(fig_pie, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
 
-def display_food_reports():
-    st.title("Food Reports")
+        st.dataframe(age_df, use_container_width=True)
 
-    tabs = st.tabs([
-        "Recall Classification",
-        "Recall Reasons",
-        "Geographic Distribution",
-        "Product Categories",
-        "Adverse Events",
-        "Trends Over Time"
-    ])
+        render_ai_insights_section(age_df, "age distribution in food adverse events", "food_age_insights")
 
-    with tabs[0]:
-        display_food_recall_classification()
+@st.fragment
+def _food_outcome_fragment(outcome_df):
+    """Top-N outcomes panel, reruns on its own when the slider moves"""
+    import plotly.express as px
 
-    with tabs[1]:
-        display_food_recall_reason()
+    # Top outcomes to show
+    top_n = st.slider("Number of top outcomes to show", 5, 15, 10, key="food_outcome_slider")
+    top_outcome_df = outcome_df.head(top_n)
 
-    with tabs[2]:
-        display_food_recall_geography()
+    col1, col2 = st.columns(2)
 
-    with tabs[3]:
-        display_food_recall_product()
+    with col1:
+        # Bar chart
+        fig_bar = px.bar(
+            top_outcome_df,
+            template=_chart_template(),
+            y="Outcome",
+            x="Count",
+            title=f"Top {top_n} Adverse Event Outcomes",
+            orientation='h',
+            color="Outcome"
+        )
+        fig_bar.update_layout(showlegend=False, yaxis={'categoryorder':'total ascending'})
+        st.plotly_chart(fig_bar, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
+
+    with col2:
+        # Pie chart
+        fig_pie = px.pie(
+            top_outcome_df,
+            template=_chart_template(),
+            values="Count",
+            names="Outcome",
+            title="Distribution of Adverse Event Outcomes"
+        )
+        st.plotly_chart(fig_pie, use_container_width=True, theme=None, config=_STATIC_CHART_CONFIG)
+
+    with st.expander("View Full Outcome Data", expanded=False):
+        st.dataframe(outcome_df, use_container_width=True)
+
+def display_food_events_by_outcome():
+    st.subheader("Adverse Events by Outcome")
+
+    outcome_df = get_food_events_by_outcome(
+        st.session_state.start_date,
+        st.session_state.end_date,
+        st.session_state.sample_size
+    )
+
+    if outcome_df.empty:
+        st.warning("No outcome data available.")
+    else:
+        _food_outcome_fragment(outcome_df)
+
+        render_ai_insights_section(outcome_df, "outcomes of food adverse events", "food_outcome_insights")
 
-    with tabs[4]:
-        display_food_adverse_events()
+def display_food_adverse_events():
+    st.subheader("Food Adverse Events Analysis")
+
+    views = {
+        "By Industry": display_food_events_by_industry,
+        "By Product": display_food_events_by_product,
+        "By Symptom": display_food_events_by_symptom,
+        "By Age": display_food_events_by_age,
+        "By Outcome": display_food_events_by_outcome
+    }
+
+    # Only the selected view runs, so hidden views don't fetch or plot
+    active_view = st.radio(
+        "Adverse Event View",
+        options=list(views),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="food_event_view"
+    )
+    views[active_view]()
+
+def display_food_reports():
+    st.title("Food Reports")
 
-    with tabs[5]:
-        display_food_trends()
+    prefetch_food_data(
+        st.session_state.start_date,
+        st.session_state.end_date,
+        st.session_state.sample_size
+    )
+
+    views = {
+        "Recall Classification": display_food_recall_classification,
+        "Recall Reasons": display_food_recall_reason,
+        "Geographic Distribution": display_food_recall_geography,
+        "Product Categories": display_food_recall_product,
+        "Adverse Events": display_food_adverse_events,
+        "Trends Over Time": display_food_trends
+    }
+
+    # st.tabs runs every tab body on each rerun; a radio only runs the selected one
+    active_view = st.radio(
+        "Food Report View",
+        options=list(views),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="food_report_view"
+    )
+    views[active_view]()
 
 def display_food_trends():
+    import plotly.express as px
+
     st.subheader("Food Safety Trends Over Time")
 
     trend_tabs = st.tabs(["Recalls by Year", "Events Timeline"])
@@ -664,28 +766,29 @@ def display_food_trends():
             # Line chart for trends
             fig_trend = px.line(
                 trend_df,
+                template=_chart_template(),
                 x="Year",
                 y=["Class I", "Class II", "Class III", "Total"],
                 title="Food Recalls by Classification and Year",
                 markers=True,
                 labels={"value": "Number of Recalls", "variable": "Classification"}
             )
-            st.plotly_chart(fig_trend, use_container_width=True)
+            st.plotly_chart(fig_trend, use_container_width=True, theme=None)
 
             # Area chart for classification percentage
             class_cols = [col for col in trend_df.columns if col not in ["Year", "Total"]]
-            percentage_df = trend_df.copy()
-            for col in class_cols:
-                percentage_df[col] = percentage_df[col] / percentage_df["Total"] * 100
+            percentage_df = trend_df[class_cols].div(trend_df["Total"], axis=0).mul(100)
+            percentage_df["Year"] = trend_df["Year"]
 
             fig_area = px.area(
                 percentage_df,
+                template=_chart_template(),
                 x="Year",
                 y=class_cols,
                 title="Classification Percentage by Year",
                 labels={"value": "Percentage", "variable": "Classification"}
             )
-            st.plotly_chart(fig_area, use_container_width=True)
+            st.plotly_chart(fig_area, use_container_width=True, theme=None)
 
             with st.expander("View Data Table", expanded=False):
                 st.dataframe(trend_df, use_container_width=True)
@@ -718,23 +821,25 @@ def display_food_trends():
         else:
             fig_line = px.line(
                 time_df,
+                template=_chart_template(),
             x="Date",
             y="Count",
                 title=f"Food Adverse Events Over Time (by {interval.capitalize()})",
             markers=True
         )
-            st.plotly_chart(fig_line, use_container_width=True)
+            st.plotly_chart(fig_line, use_container_width=True, theme=None)
 
             # Bar chart
             fig_bar = px.bar(
                 time_df,
+                template=_chart_template(),
                 x="Date",
                 y="Count",
                 title=f"Food Adverse Events by {interval.capitalize()}",
                 color="Count",
                 color_continuous_scale=px.colors.sequential.Viridis
             )
-            st.plotly_chart(fig_bar, use_container_width=True)
+            st.plotly_chart(fig_bar, use_container_width=True, theme=None)
 
             with st.expander("View Data Table", expanded=False):
                 st.dataframe(time_df, use_container_width=True)
@@ -5,6 +5,10 @@ from dotenv import load_dotenv
 import sys
 import time
 import concurrent.futures
+import io
+import atexit
+import re
+import sqlite3
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -20,310 +24,335 @@ from src.tobacco_endpoints import (
     get_tobacco_reports_by_health_effect,
     get_tobacco_reports_by_product
 )
+from src.llm_cache import SemanticCache, prompt_key
 
 # Initialize session state for sample_size
 if "sample_size" not in st.session_state:
     st.session_state.sample_size = 1000  # Default sample size
 
-load_dotenv()
+# .env is only read when the launcher did not already provide the key
+if "GEMINI_API_KEY" not in os.environ:
+    load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
-@st.cache_data(ttl=3600)
-def generate_healthcare_trends_summary(include_drug=True, include_food=True, include_tobacco=True):
+# The fetchers are st.cache_data functions, so using the same arguments everywhere
+# lets the summary, the prediction and the preload share cached frames
+TREND_SAMPLE_SIZE = 1000
+
+# Shared pool for OpenFDA fetches, the calls are I/O-bound
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="fda")
+atexit.register(_EXECUTOR.shutdown, wait=False)
+
+# Rows of each frame sent to Gemini, enough for trends while keeping prompt size bounded
+PROMPT_ROWS = 5
+
+def _frame_to_prompt(df, n=PROMPT_ROWS):
+    """Serialize the top rows of a frame as pipe-separated lines, which costs far fewer tokens than aligned to_string output"""
+    df = df.head(n)
+    # Three significant digits are plenty for shares and rates and keep long float tails out of the prompt
+    return df.to_csv(index=False, sep="|", lineterminator="\n", float_format="%.3g").rstrip("\n")
+
+# Keywords used to decide which category a question is most related to
+DRUG_KEYWORDS = frozenset({"drug", "medication", "pharmaceutical", "prescription", "medicine", "pill", "capsule", "tablet", "adverse"})
+DRUG_PHRASES = ("side effect",)
+FOOD_KEYWORDS = frozenset({"food", "dietary", "nutrition", "ingredient", "allergen", "eat", "consumption", "recall", "contamination", "pathogen"})
+TOBACCO_KEYWORDS = frozenset({"tobacco", "smoking", "cigarette", "vape", "vaping", "e-cigarette", "nicotine", "cigar", "smokeless"})
+
+_WORD_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+def _question_tokens(question_lower):
+    """Words in a lowercased question, plus the parts of hyphenated words and singular forms of plurals"""
+    tokens = set(_WORD_RE.findall(question_lower))
+    extra = [part for token in tokens if "-" in token for part in token.split("-")]
+    extra += [token[:-1] for token in tokens if token.endswith("s")]
+    tokens.update(extra)
+    return tokens
+
+# Data fetched for each prediction category: (key, prompt label, keywords, phrases, fetcher)
+TREND_ROUTES = {
+    "Drug Safety": [
+        ("drug_events", "Top drugs with adverse events", frozenset({"adverse", "reaction", "event"}), ("side effect",),
+         lambda n: adverse_events_by_drug_within_data_range("2020-01-01", "2023-12-31", n)),
+        ("drug_recalls", "Top recalled drugs", frozenset({"recall", "withdraw", "safety", "enforcement"}), (),
+         lambda n: most_common_recalled_drugs(limit=n))
+    ],
+    "Food Safety": [
+        ("food_recalls", "Food recall classifications", frozenset({"class", "classification", "category", "type"}), (),
+         lambda n: get_food_recalls_by_classification(None, None, n)),
+        ("food_reasons", "Food recall reasons", frozenset({"reason", "cause", "why", "contamination", "allergen"}), (),
+         lambda n: get_food_recalls_by_reason(None, None, n))
+    ],
+    "Tobacco Effects": [
+        ("tobacco_effects", "Tobacco health effects", frozenset({"health", "effect", "impact", "symptom", "condition"}), (),
+         lambda n: get_tobacco_reports_by_health_effect(None, None, n)),
+        ("tobacco_products", "Tobacco products", frozenset({"product", "cigarette", "vape", "cigar", "smokeless"}), (),
+         lambda n: get_tobacco_reports_by_product(None, None, n))
+    ]
+}
+
+# Datasets from TREND_ROUTES that go into the healthcare trends summary
+SUMMARY_DATASETS = {
+    "Drug Safety": ("drug_events", "drug_recalls"),
+    "Food Safety": ("food_recalls", "food_reasons"),
+    "Tobacco Effects": ("tobacco_effects",)
+}
+
+def _categorized_frame(result):
+    """Frame to put in a prompt, the categorized part of dict results"""
+    if isinstance(result, dict):
+        return result.get("categorized")
+    return result
+
+# Prompt text that does not change between calls
+ANALYST_ROLE = "Healthcare data analyst"
+FORECASTER_ROLE = f"{ANALYST_ROLE} and forecaster, FDA data."
+SUMMARY_INSTRUCTIONS = (
+    "Write a 3-5 paragraph analysis of observable healthcare trends covering: public health implications, "
+    "emerging patterns in recalls, adverse events and health effects, correlations across drug, food and tobacco data, "
+    "recommendations for healthcare professionals and regulators. "
+    "Combine data observations with future projections in one cohesive, data-driven narrative. Stay under 700 words."
+)
 
-    # Initialize data collection
-    data_points = []
+# Output instructions shared by both trend prediction prompts
+PREDICTION_OUTPUT_SPEC = (
+    "Output: 1) prediction with reasoning, 2-3 paragraphs; 2) 3-5 key factors influencing the trend; "
+    "3) confidence high/medium/low with explanation; 4) data sources and evidence used. "
+    "Be substantive and data-driven, never decline for lack of data. Stay under 1000 words."
+)
 
-    # Use a smaller sample size for better performance
-    sample_size = 1000
+# The fixed instructions go in the system instruction, ahead of the per-call data and
+# question, so every request starts with the same prefix Gemini can cache
+SUMMARY_SYSTEM_INSTRUCTION = f"{ANALYST_ROLE}. {SUMMARY_INSTRUCTIONS}"
+PREDICTION_SYSTEM_INSTRUCTION = f"{FORECASTER_ROLE} {PREDICTION_OUTPUT_SPEC}"
 
-    # It will colledt food drug or tabacco data if requested
-    if include_drug:
-        try:
-            drug_events = adverse_events_by_drug_within_data_range("2020-01-01", "2023-12-31")
-            drug_recalls = most_common_recalled_drugs(limit=sample_size)
+# Built once and reused by every generate call
+if GEMINI_API_KEY:
+    _SUMMARY_MODEL = genai.GenerativeModel("gemini-1.5-flash", system_instruction=SUMMARY_SYSTEM_INSTRUCTION)
+    _PREDICTION_MODEL = genai.GenerativeModel("gemini-1.5-flash", system_instruction=PREDICTION_SYSTEM_INSTRUCTION)
+else:
+    _SUMMARY_MODEL = _PREDICTION_MODEL = None
+
+# Output caps, the prompts ask for lengths that fit inside them
+SUMMARY_GENERATION_CONFIG = {"max_output_tokens": 1024, "temperature": 0.4}
+PREDICTION_GENERATION_CONFIG = {"max_output_tokens": 1536, "temperature": 0.4}
+
+# Gemini responses shared across sessions and restarts, found by prompt hash
+# or, for predictions, by a similar question asked about the same data
+GEMINI_CACHE_TTL = 24 * 3600  # 24 hours
+EMBEDDING_MODEL = "models/text-embedding-004"
+_RESPONSE_CACHE = SemanticCache(ttl=GEMINI_CACHE_TTL)
+
+def _read_cached_response(prompt):
+    """Stored response for an identical prompt, or None when missing or expired"""
+    try:
+        return _RESPONSE_CACHE.get(prompt_key(prompt))
+    except sqlite3.Error:
+        return None
 
-            if not drug_events.empty:
-                data_points.append(f"Top drugs with adverse events:\n{drug_events.head(5).to_string(index=False)}")
+def _write_cached_response(prompt, text, scope=None, embedding=None):
+    # A failed write only costs a future cache miss
+    try:
+        _RESPONSE_CACHE.set(prompt_key(prompt), text, scope, embedding)
+    except sqlite3.Error:
+        pass
 
-            if not drug_recalls.empty:
-                data_points.append(f"Top recalled drugs:\n{drug_recalls.head(5).to_string(index=False)}")
-        except Exception as e:
-            data_points.append(f"Drug data extraction error: {str(e)}")
+def _embed_question(question):
+    """Embedding used for similarity lookups, None when it can't be computed"""
+    try:
+        return genai.embed_content(model=EMBEDDING_MODEL, content=question)["embedding"]
+    except Exception:
+        return None
+
+# Same lifetime as the SQLite cache, so a response never outlives its stored copy in memory
+@st.cache_data(ttl=GEMINI_CACHE_TTL, max_entries=128, show_spinner=False)
+def _cached_generate(prompt):
+    """Return Gemini's text for a prompt, reusing a stored response for an identical prompt"""
+    text = _read_cached_response(prompt)
+    if text is not None:
+        return text
+
+    if _SUMMARY_MODEL is None:
+        raise RuntimeError("Gemini API key missing")
+    text = _SUMMARY_MODEL.generate_content(prompt, generation_config=SUMMARY_GENERATION_CONFIG).text
+    _write_cached_response(prompt, text)
+    return text
+
+def _stream_generate(prompt, scope=None, question=None):
+    """Yield Gemini's text for a prompt as it is produced, or a stored response in one piece"""
+    text = _read_cached_response(prompt)
+    if text is not None:
+        yield text
+        return
+
+    # A near-duplicate question about the same data can reuse its answer
+    embedding = None
+    if scope and question:
+        embedding = _embed_question(question)
+        if embedding is not None:
+            try:
+                text = _RESPONSE_CACHE.find_similar(scope, embedding)
+            except sqlite3.Error:
+                text = None
+            if text is not None:
+                yield text
+                return
+
+    if _PREDICTION_MODEL is None:
+        raise RuntimeError("Gemini API key missing")
+    chunks = []
+    for chunk in _PREDICTION_MODEL.generate_content(prompt, generation_config=PREDICTION_GENERATION_CONFIG, stream=True):
+        chunks.append(chunk.text)
+        yield chunk.text
+    _write_cached_response(prompt, "".join(chunks), scope, embedding)
 
-    if include_food:
+@st.cache_data(ttl=3600)
+def _dataset_block(trend_category, key, sample_size):
+    """Prompt block for one of a category's datasets, or None when it has no rows. Cached per
+    dataset so the summary, the prediction and changes to the included categories all reuse it.
+    Fetch errors propagate, so a failed endpoint is never cached"""
+    _, label, _, _, fetch = next(route for route in TREND_ROUTES[trend_category] if route[0] == key)
+    frame = _categorized_frame(fetch(sample_size))
+    if frame is None or frame.empty:
+        return None
+    return f"{label}:\n{_frame_to_prompt(frame)}"
+
+def _category_data_points(trend_category, keys, sample_size):
+    """Prompt blocks and error lines for some of a category's datasets"""
+    labels = {route[0]: route[1] for route in TREND_ROUTES[trend_category]}
+    data_points, errors = [], []
+    # Each dataset reports its own error, so one failed endpoint doesn't drop the rest of the category
+    for key in keys:
         try:
-            food_recalls = get_food_recalls_by_classification(None, None, sample_size)
-            food_reasons = get_food_recalls_by_reason(None, None, sample_size)
-
-            if not food_recalls.empty:
-                data_points.append(f"Food recall classifications:\n{food_recalls.to_string(index=False)}")
-
-            if isinstance(food_reasons, dict) and "categorized" in food_reasons and not food_reasons["categorized"].empty:
-                data_points.append(f"Food recall reasons:\n{food_reasons['categorized'].head(5).to_string(index=False)}")
+            block = _dataset_block(trend_category, key, sample_size)
         except Exception as e:
-            data_points.append(f"Food data extraction error: {str(e)}")
+            errors.append(f"{labels[key]} extraction error: {str(e)}")
+            continue
+        if block is not None:
+            data_points.append(block)
+    return data_points, errors
 
-    if include_tobacco:
-        try:
-            tobacco_effects = get_tobacco_reports_by_health_effect(None, None, sample_size)
+def generate_healthcare_trends_summary(include_drug=True, include_food=True, include_tobacco=True):
+    # Nothing to fetch or build without a model to send it to
+    if not GEMINI_API_KEY:
+        return "GEMINI_API_KEY not configured."
+
+    sample_size = TREND_SAMPLE_SIZE
+    included = {"Drug Safety": include_drug, "Food Safety": include_food, "Tobacco Effects": include_tobacco}
+    categories = [category for category, include in included.items() if include]
+
+    # Start every requested fetch at once so the wait is the slowest call, not the sum;
+    # the blocks below then read the warmed fetcher caches. A failed fetch is not
+    # re-raised here, its block reports the error instead
+    fetchers = [
+        fetch
+        for category in categories
+        for key, _, _, _, fetch in TREND_ROUTES[category]
+        if key in SUMMARY_DATASETS[category]
+    ]
+    concurrent.futures.wait([_EXECUTOR.submit(fetch, sample_size) for fetch in fetchers])
 
-            if isinstance(tobacco_effects, dict) and "categorized" in tobacco_effects and not tobacco_effects["categorized"].empty:
-                data_points.append(f"Tobacco health effects:\n{tobacco_effects['categorized'].head(5).to_string(index=False)}")
-        except Exception as e:
-            data_points.append(f"Tobacco data extraction error: {str(e)}")
+    data_points = []
+    for category in categories:
+        blocks, errors = _category_data_points(category, SUMMARY_DATASETS[category], sample_size)
+        data_points += blocks + errors
 
     # If no data was collected, return an error message
     if not data_points:
         return "No data available to generate a healthcare trends summary."
 
-    # targeted prompt for healthcare trends
-    prompt = f"""
-    You are a healthcare data analyst tasked with identifying trends from FDA data.
-
-    Based on the following FDA data samples:
-
-    {"".join(f"{i+1}. {data}\n\n" for i, data in enumerate(data_points))}
-
-    Please provide a 3-5 paragraph analysis of healthcare trends that might be observable from this data.
-    Focus on:
-    1. Potential public health implications
-    2. Emerging patterns in recalls, adverse events, and health effects
-    3. Correlations between different types of FDA data (drugs, food, tobacco)
-    4. Recommendations for healthcare professionals or regulatory bodies
-
-    Include both observations from the data and potential future projections.
-    Your analysis should be insightful, data-driven, and present a cohesive narrative about current healthcare trends.
-    """
+    # targeted prompt for healthcare trends, written into one buffer so each data point is copied
+    # a single time (the instructions live in the summary model's system instruction)
+    buf = io.StringIO()
+    buf.write("FDA data samples:\n\n")
+    for i, data in enumerate(data_points, 1):
+        buf.write(f"{i}. {data}\n\n")
+    prompt = buf.getvalue()
 
+    # The response is cached by prompt hash, so unchanged data never reaches Gemini twice
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+        return _cached_generate(prompt)
     except Exception as e:
         return f"Error generating healthcare trends summary: {e}"
 
-@st.cache_data(ttl=3600)
-def generate_trend_prediction(trend_category, prediction_question):
-    sample_size = 1000
-
-    data_points = []
-    data_available = False
-
-    # Identify keywords in the question to determine which data to fetch
+def build_trend_prediction_prompt(trend_category, prediction_question):
+    # Identify keywords in the question to determine which data to use
     question_lower = prediction_question.lower()
+    tokens = _question_tokens(question_lower)
+    routes = TREND_ROUTES.get(trend_category, [])
+    matched = tuple(
+        key for key, _, keywords, phrases, _ in routes
+        if tokens & keywords or any(phrase in question_lower for phrase in phrases)
+    )
 
-    if trend_category == "Drug Safety":
-        try:
-            # Check for specific keywords to determine which drug data to fetch
-            fetched_data = False
-
-            # Adverse events data
-            if any(keyword in question_lower for keyword in ["adverse", "side effect", "reaction", "event"]):
-                drug_events = adverse_events_by_drug_within_data_range("2020-01-01", "2023-12-31", sample_size)
-                if not drug_events.empty:
-                    data_points.append(f"Top drugs with adverse events:\n{drug_events.to_string(index=False)}")
-                    fetched_data = True
-                    data_available = True
-
-            # Recall data
-            if any(keyword in question_lower for keyword in ["recall", "withdraw", "safety", "enforcement"]):
-                drug_recalls = most_common_recalled_drugs(limit=sample_size)
-                if not drug_recalls.empty:
-                    data_points.append(f"Top recalled drugs:\n{drug_recalls.to_string(index=False)}")
-                    fetched_data = True
-                    data_available = True
-
-            # If no specific data matched keywords, fetch general data
-            if not fetched_data:
-                drug_events = adverse_events_by_drug_within_data_range("2020-01-01", "2023-12-31", sample_size)
-                drug_recalls = most_common_recalled_drugs(limit=sample_size)
-
-                if not drug_events.empty:
-                    data_points.append(f"Top drugs with adverse events:\n{drug_events.head(5).to_string(index=False)}")
-                    data_available = True
-
-                if not drug_recalls.empty:
-                    data_points.append(f"Top recalled drugs:\n{drug_recalls.head(5).to_string(index=False)}")
-                    data_available = True
-
-        except Exception as e:
-            data_points.append(f"Drug data extraction error: {str(e)}")
-
-    elif trend_category == "Food Safety":
-        try:
-            fetched_data = False
-
-            # Food classification data
-            if any(keyword in question_lower for keyword in ["class", "classification", "category", "type"]):
-                food_recalls = get_food_recalls_by_classification(None, None, sample_size)
-                if not food_recalls.empty:
-                    data_points.append(f"Food recall classifications:\n{food_recalls.to_string(index=False)}")
-                    fetched_data = True
-                    data_available = True
-
-            # Food recall reason data
-            if any(keyword in question_lower for keyword in ["reason", "cause", "why", "contamination", "allergen"]):
-                food_reasons = get_food_recalls_by_reason(None, None, sample_size)
-                if isinstance(food_reasons, dict) and "categorized" in food_reasons and not food_reasons["categorized"].empty:
-                    data_points.append(f"Food recall reasons:\n{food_reasons['categorized'].to_string(index=False)}")
-                    fetched_data = True
-                    data_available = True
-
-            if not fetched_data:
-                food_recalls = get_food_recalls_by_classification(None, None, sample_size)
-                food_reasons = get_food_recalls_by_reason(None, None, sample_size)
-
-                if not food_recalls.empty:
-                    data_points.append(f"Food recall classifications:\n{food_recalls.head(5).to_string(index=False)}")
-                    data_available = True
-
-                if isinstance(food_reasons, dict) and "categorized" in food_reasons and not food_reasons["categorized"].empty:
-                    data_points.append(f"Food recall reasons:\n{food_reasons['categorized'].head(5).to_string(index=False)}")
-                    data_available = True
-
-        except Exception as e:
-            data_points.append(f"Food data extraction error: {str(e)}")
-
-    elif trend_category == "Tobacco Effects":
-        try:
-            fetched_data = False
-
-            # Health effects data
-            if any(keyword in question_lower for keyword in ["health", "effect", "impact", "symptom", "condition"]):
-                tobacco_effects = get_tobacco_reports_by_health_effect(None, None, sample_size)
-                if isinstance(tobacco_effects, dict) and "categorized" in tobacco_effects and not tobacco_effects["categorized"].empty:
-                    data_points.append(f"Tobacco health effects:\n{tobacco_effects['categorized'].to_string(index=False)}")
-                    fetched_data = True
-                    data_available = True
-
-            # Product data
-            if any(keyword in question_lower for keyword in ["product", "cigarette", "vape", "cigar", "smokeless"]):
-                tobacco_products = get_tobacco_reports_by_product(None, None, sample_size)
-                if isinstance(tobacco_products, dict) and "categorized" in tobacco_products and not tobacco_products["categorized"].empty:
-                    data_points.append(f"Tobacco products:\n{tobacco_products['categorized'].to_string(index=False)}")
-                    fetched_data = True
-                    data_available = True
-
-            if not fetched_data:
-                tobacco_effects = get_tobacco_reports_by_health_effect(None, None, sample_size)
-                tobacco_products = get_tobacco_reports_by_product(None, None, sample_size)
-
-                if isinstance(tobacco_effects, dict) and "categorized" in tobacco_effects and not tobacco_effects["categorized"].empty:
-                    data_points.append(f"Tobacco health effects:\n{tobacco_effects['categorized'].head(5).to_string(index=False)}")
-                    data_available = True
-
-                if isinstance(tobacco_products, dict) and "categorized" in tobacco_products and not tobacco_products["categorized"].empty:
-                    data_points.append(f"Tobacco products:\n{tobacco_products['categorized'].head(5).to_string(index=False)}")
-                    data_available = True
+    # The blocks come from the same cache as the summary, so data already sent there is not rebuilt
+    data_points, errors = _category_data_points(trend_category, matched, TREND_SAMPLE_SIZE) if matched else ([], [])
 
-        except Exception as e:
-            data_points.append(f"Tobacco data extraction error: {str(e)}")
+    # If no specific data matched keywords, use general data
+    if not data_points and routes:
+        data_points, errors = _category_data_points(trend_category, tuple(route[0] for route in routes), TREND_SAMPLE_SIZE)
+    data_available = bool(data_points)
+    data_points = data_points + errors
 
     # targeted prompt for trend prediction based on whether we have data
     if data_available:
-        prompt = f"""
-        You are a healthcare data analyst and forecaster specializing in FDA data analysis.
-
-        Based on the following {trend_category} data that I'm providing:
-
-        {"".join(f"{data}\n\n" for data in data_points)}
-
-        Answer this specific question about future trends:
-        "{prediction_question}"
-
-        If you need additional data beyond what's provided, you may search for and analyze more comprehensive FDA data from the OpenFDA API endpoints.
-
-        Provide:
-        1. A substantive and detailed prediction with reasoning (2-3 paragraphs) based on the provided data and any additional data you find necessary
-        2. Key factors that could influence this trend (list at least 3-5 factors)
-        3. Confidence level in your prediction (high, medium, or low) with explanation
-        4. Summary of the data sources and evidence that informed your prediction
-
-        Your response MUST be substantive and data-driven. Never claim that you cannot make a prediction due to insufficient data.
-        """
+        buf = io.StringIO()
+        buf.write(f"{trend_category} data:\n\n")
+        for data in data_points:
+            buf.write(data)
+            buf.write("\n\n")
+        buf.write("Use other OpenFDA endpoints if more data is needed.\n")
+        buf.write(f'Question about future trends: "{prediction_question}"')
+        prompt = buf.getvalue()
     else:
         # prompt instructing to search for data
-        prompt = f"""
-        You are a healthcare data analyst and forecaster specializing in FDA data analysis.
-
-        I don't have specific data to provide for your question about {trend_category}:
-        "{prediction_question}"
-
-        Please actively search for and analyze comprehensive FDA data from the OpenFDA API endpoints, including but not limited to:
-        - https://api.fda.gov/drug/event.json (adverse drug events)
-        - https://api.fda.gov/drug/enforcement.json (drug recalls and enforcement actions)
-        - https://api.fda.gov/food/enforcement.json (food recalls and safety data)
-        - https://api.fda.gov/tobacco/problem.json (tobacco products reports)
-        - Utilize other relevant OpenFDA endpoints as needed
-
-        When analyzing OpenFDA data, consider:
-        - Historical trends over the past 5-10 years
-        - Changes in reporting frequencies
-        - Geographic patterns
-        - Demographic factors
-        - Regulatory actions and their outcomes
-
-        Also supplement with your knowledge of current scientific literature, research trends, and regulatory developments in the healthcare field.
-
-        Provide:
-        1. A substantive and detailed prediction with reasoning (2-3 paragraphs) based on the data you find
-        2. Key factors that could influence this trend (list at least 3-5 factors)
-        3. Confidence level in your prediction (high, medium, or low) with explanation
-        4. Summary of the data sources and evidence that informed your prediction
-
-        Your response MUST be substantive and data-driven. Never claim that you cannot make a prediction due to insufficient data.
-        """
-
+        prompt = (
+            "Draw on OpenFDA endpoints (drug/event, drug/enforcement, food/enforcement, tobacco/problem, others as relevant): "
+            "5-10 year trends, reporting frequency changes, geographic and demographic patterns, regulatory actions and outcomes. "
+            "Add current scientific literature, research and regulatory developments.\n"
+            f"No data supplied for this {trend_category} question:\n"
+            f'"{prediction_question}"'
+        )
+
+    # Similar questions only share an answer when they were asked about the same data
+    data_hash = prompt_key("\n\n".join(data_points))
+    return prompt, f"{trend_category}|{data_hash}"
+
+PREDICTION_ERROR_PREFIX = "Error generating trend prediction: "
+
+def stream_trend_prediction(prompt, scope=None, question=None, outcome=None):
+    """Yield the trend prediction in chunks so it can be shown while Gemini is still writing.
+    When given, outcome["completed"] is set only after the whole response has streamed"""
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+        yield from _stream_generate(prompt, scope, question)
     except Exception as e:
-        return f"Error generating trend prediction: {e}"
-
-def load_data_concurrently(trend_category, sample_size=1000):
-    data_results = {}
-
-    if trend_category == "Drug Safety":
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_drug_events = executor.submit(
-                adverse_events_by_drug_within_data_range, "2020-01-01", "2023-12-31", sample_size
-            )
-            future_drug_recalls = executor.submit(
-                most_common_recalled_drugs, sample_size
-            )
-
-            data_results["drug_events"] = future_drug_events.result()
-            data_results["drug_recalls"] = future_drug_recalls.result()
-
-    elif trend_category == "Food Safety":
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_food_recalls = executor.submit(
-                get_food_recalls_by_classification, None, None, sample_size
-            )
-            future_food_reasons = executor.submit(
-                get_food_recalls_by_reason, None, None, sample_size
-            )
+        yield f"{PREDICTION_ERROR_PREFIX}{e}"
+        return
+    if outcome is not None:
+        outcome["completed"] = True
 
-            data_results["food_recalls"] = future_food_recalls.result()
-            data_results["food_reasons"] = future_food_reasons.result()
+TREND_CATEGORIES = ["Drug Safety", "Food Safety", "Tobacco Effects"]
 
-    elif trend_category == "Tobacco Effects":
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_tobacco_effects = executor.submit(
-                get_tobacco_reports_by_health_effect, None, None, sample_size
-            )
-            future_tobacco_products = executor.submit(
-                get_tobacco_reports_by_product, None, None, sample_size
-            )
-
-            data_results["tobacco_effects"] = future_tobacco_effects.result()
-            data_results["tobacco_products"] = future_tobacco_products.result()
-
-    return data_results
+def _question_category(prediction_question):
+    """The category whose keywords the question mentions most, drugs when none match"""
+    # Count keyword matches in the question, tokenized once
+    question_lower = prediction_question.lower()
+    tokens = _question_tokens(question_lower)
+    drug_count = len(tokens & DRUG_KEYWORDS) + sum(phrase in question_lower for phrase in DRUG_PHRASES)
+    food_count = len(tokens & FOOD_KEYWORDS)
+    tobacco_count = len(tokens & TOBACCO_KEYWORDS)
+
+    # Determine the most relevant category
+    counts = [drug_count, food_count, tobacco_count]
+    category_index = counts.index(max(counts)) if max(counts) > 0 else 0  # Default to drugs if no matches
+    return TREND_CATEGORIES[category_index]
+
+def _submit_category_fetches(trend_category, sample_size):
+    return {
+        key: _EXECUTOR.submit(fetch, sample_size)
+        for key, _, _, _, fetch in TREND_ROUTES.get(trend_category, [])
+    }
 
 def display_healthcare_trends():
     st.title("Healthcare Trends Analysis")
@@ -337,17 +366,6 @@ def display_healthcare_trends():
     Ask a specific question about future developments in drug safety, food safety, or tobacco effects.
     """)
 
-    # Pre-load data for all categories in the background
-    if "preloaded_data" not in st.session_state:
-        st.session_state.preloaded_data = {}
-
-    # Start background loading for all categories if not already loaded
-    categories = ["Drug Safety", "Food Safety", "Tobacco Effects"]
-    for category in categories:
-        if category not in st.session_state.preloaded_data:
-            with st.spinner(f"Pre-loading {category} data..."):
-                st.session_state.preloaded_data[category] = load_data_concurrently(category, st.session_state.sample_size)
-
     st.markdown("### Ask About Future Trends")
 
     example_questions = [
@@ -367,72 +385,88 @@ def display_healthcare_trends():
         placeholder=f"e.g., {example_questions[0]}"
     )
 
+    # Only the category the question is about is loaded, as soon as the question is entered,
+    # on the pool and without blocking the render. The fetchers cache the frames; the
+    # session only keeps the futures to wait on
+    trend_fetches = st.session_state.setdefault("trend_fetches", {})
+    if prediction_question:
+        trend_category = _question_category(prediction_question)
+        if trend_category not in trend_fetches:
+            trend_fetches[trend_category] = _submit_category_fetches(trend_category, TREND_SAMPLE_SIZE)
+
     if st.button("Generate Prediction", key="generate_prediction"):
         if not prediction_question:
             st.error("Please enter a prediction question.")
+        elif not GEMINI_API_KEY:
+            st.error("GEMINI_API_KEY not configured. Predictions are unavailable.")
         else:
-            # Determine which category the question is most related to
-            drug_keywords = ["drug", "medication", "pharmaceutical", "prescription", "medicine", "pill", "capsule", "tablet", "adverse", "side effect"]
-            food_keywords = ["food", "dietary", "nutrition", "ingredient", "allergen", "eat", "consumption", "recall", "contamination", "pathogen"]
-            tobacco_keywords = ["tobacco", "smoking", "cigarette", "vape", "vaping", "e-cigarette", "nicotine", "cigar", "smokeless"]
-
-            # Count matches in the question
-            question_lower = prediction_question.lower()
-            drug_count = sum(1 for keyword in drug_keywords if keyword in question_lower)
-            food_count = sum(1 for keyword in food_keywords if keyword in question_lower)
-            tobacco_count = sum(1 for keyword in tobacco_keywords if keyword in question_lower)
-
-            # Determine the most relevant category
-            counts = [drug_count, food_count, tobacco_count]
-            category_index = counts.index(max(counts)) if max(counts) > 0 else 0  # Default to drugs if no matches
-            trend_category = categories[category_index]
-
-            with st.spinner(f"Analyzing FDA data and generating prediction..."):
+            # A question already answered in this session is shown again without
+            # waiting on fetches, rebuilding the prompt or looking up the response cache
+            prediction_results = st.session_state.setdefault("prediction_results", {})
+            result_key = prompt_key(f"{trend_category}|{prediction_question}")
+
+            if result_key in prediction_results:
+                prediction = prediction_results[result_key]
+                st.subheader("Prediction Analysis")
+                st.markdown(prediction)
+            else:
                 prediction_placeholder = st.empty()
 
-                # progress bar in the placeholder
+                # progress bar in the placeholder until the data is ready
                 with prediction_placeholder.container():
-                    progress_bar = st.progress(0)
-                    st.info("Processing your question...")
-
-                    # Simulate progress while actually doing the work
-                    for i in range(25):
-                        time.sleep(0.01)
-                        progress_bar.progress(i)
-
-                    st.info(f"Analyzing FDA data across categories...")
-                    for i in range(25, 55):
-                        time.sleep(0.01)
-                        progress_bar.progress(i)
-
-                    st.info("Identifying patterns and projecting future trends...")
-                    for i in range(55, 85):
-                        time.sleep(0.01)
-                        progress_bar.progress(i)
+                    progress_bar = st.progress(10, text=f"Analyzing {trend_category} data...")
 
-                    st.info("Generating comprehensive analysis...")
-                    for i in range(85, 100):
-                        time.sleep(0.01)
-                        progress_bar.progress(i)
+                # Wait for the chosen category's background fetches, the bar follows
+                # how many of them have actually finished
+                futures = trend_fetches[trend_category]
+                while True:
+                    done = sum(future.done() for future in futures.values())
+                    progress_bar.progress(10 + 80 * done // max(len(futures), 1), text=f"Analyzing {trend_category} data...")
+                    if done == len(futures):
+                        break
+                    time.sleep(0.05)
 
-                # Generate the prediction
-                prediction = generate_trend_prediction(trend_category, prediction_question)
+                # Fetch the data and build the prompt
+                prompt, scope = build_trend_prediction_prompt(trend_category, prediction_question)
 
                 # Clear placeholder
                 prediction_placeholder.empty()
 
-                # Display prediction
+                # Display prediction as it streams in
                 st.subheader("Prediction Analysis")
-                st.markdown(prediction)
+                outcome = {"completed": False}
+                prediction = st.write_stream(stream_trend_prediction(prompt, scope, prediction_question, outcome))
+
+                # Failed generations, including ones that broke off mid-stream, are retried
+                # on the next click rather than replayed
+                if outcome["completed"]:
+                    prediction_results[result_key] = prediction
+
+            # download button for the prediction
+            st.download_button(
+                "Download Prediction Report",
+                prediction,
+                "trend_prediction.txt",
+                "text/plain",
+                key="download_prediction"
+            )
+
+    st.markdown("### Current Trends Summary")
+    st.write("Summarize the trends visible in recent FDA data for the selected categories.")
 
-                # download button for the prediction
-                st.download_button(
-                    "Download Prediction Report",
-                    prediction,
-                    "trend_prediction.txt",
-                    "text/plain",
-                    key="download_prediction"
-                )
+    col1, col2, col3 = st.columns(3)
+    include_drug = col1.checkbox("Drug Safety", value=True, key="summary_include_drug")
+    include_food = col2.checkbox("Food Safety", value=True, key="summary_include_food")
+    include_tobacco = col3.checkbox("Tobacco Effects", value=True, key="summary_include_tobacco")
+
+    # Nothing is fetched for the summary until it is asked for
+    if st.button("Generate Summary", key="generate_summary"):
+        if not (include_drug or include_food or include_tobacco):
+            st.error("Select at least one category to summarize.")
+        else:
+            with st.spinner("Summarizing FDA data..."):
+                summary = generate_healthcare_trends_summary(include_drug, include_food, include_tobacco)
+            st.markdown(summary)
 
     st.markdown("---")
     st.caption("""
@@ -2,93 +2,82 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
-from datetime import datetime, date
+import importlib
+from datetime import date
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Streamlit executes this script again on every rerun, so the project root is only added once
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
-from app.device_page import display_device_reports
-from app.food_page import display_food_reports
-from app.drug_page import display_drug_reports
-from app.tobacco_page import display_tobacco_reports
-from app.other_page import display_other_data
-from app.healthcare_trends import display_healthcare_trends
-from app.correlation_analysis import display_correlation_analysis
 from src.data_utils import clear_cache
+from src.components import render_global_controls
+
+@st.cache_resource(show_spinner=False)
+def _page(module_name, function_name):
+    """Display function of a page module, imported the first time any session opens its page
+    and shared by every session afterwards"""
+    return getattr(importlib.import_module(module_name), function_name)
+
+OVERVIEW_MARKDOWN = """
+This dashboard provides comprehensive analysis of FDA data across multiple categories:
+
+- **Devices**: Analysis of medical device events, including device class distribution, problems, and manufacturer analysis
+- **Drugs**: Analysis of drug adverse events and safety data
+- **Food**: Analysis of food recalls and safety data
+- **Tobacco**: Analysis of tobacco product reports and safety data
+- **Other**: Other FDA datasets including substance and NSDE data
+- **Healthcare Trends**: AI-powered prediction of future healthcare trends based on FDA data
+- **Correlation Analysis**: Cross-category analysis that identifies relationships between different data domains
+
+Use the global controls above to adjust the data sampling and date range for all analyses.
+Each page features subtabs with specialized analyses and visualizations.
+"""
+
+# Only the values change between runs, so the overview page and the sidebar fill in one template
+# and render it as a single element
+SETTINGS_TEMPLATE = (
+    "- Maximum Sample Size: {sample_size:,} records\n"
+    "- Top Results to Display: {top_n_results}\n"
+    "- Date Range: {start_date} to {end_date}"
+)
+
+def _current_settings_text():
+    state = st.session_state
+    return SETTINGS_TEMPLATE.format(
+        sample_size=state.sample_size,
+        top_n_results=state.top_n_results,
+        start_date=state.start_date,
+        end_date=state.end_date
+    )
 
-def display_home():
+# Report pages in navigation order: (title, url path, module, display function)
+REPORT_PAGES = (
+    ("Drug Reports", "drugs", "app.drug_page", "display_drug_reports"),
+    ("Device Reports", "devices", "app.device_page", "display_device_reports"),
+    ("Food Reports", "food", "app.food_page", "display_food_reports"),
+    ("Tobacco Reports", "tobacco", "app.tobacco_page", "display_tobacco_reports"),
+    ("Other Data", "other", "app.other_page", "display_other_data"),
+    ("Healthcare Trends", "trends", "app.healthcare_trends", "display_healthcare_trends"),
+    ("Correlation Analysis", "correlation", "app.correlation_analysis", "display_correlation_analysis")
+)
+
+def _page_runner(module_name, function_name):
+    """Page callable that resolves the display function only when the page is opened"""
+    return lambda: _page(module_name, function_name)()
+
+def display_home(today):
     # Global Controls Section
     st.header("Global Controls")
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.subheader("Data Sampling")
-        # Sample size slider
-        st.session_state.sample_size = st.slider(
-            "Maximum Sample Size",
-            min_value=100,
-            max_value=10000,
-            value=st.session_state.sample_size,
-            step=100,
-            help="Maximum number of records to fetch for each query",
-            key="home_sample_size"
-        )
-
-        # Top N results slider
-        st.session_state.top_n_results = st.slider(
-            "Number of Top Results to Display",
-            min_value=5,
-            max_value=50,
-            value=st.session_state.top_n_results,
-            step=5,
-            help="Number of top results to show in charts and tables",
-            key="home_top_n_results"
-        )
-
-    with col2:
-        st.subheader("Date Range")
-        # Date range picker
-        st.session_state.start_date = st.date_input(
-            "Start Date",
-            value=st.session_state.start_date,
-            min_value=date(2020, 1, 1),
-            max_value=date.today(),
-            help="Start date for data analysis",
-            key="home_start_date"
-        )
-        st.session_state.end_date = st.date_input(
-            "End Date",
-            value=st.session_state.end_date,
-            min_value=st.session_state.start_date,
-            max_value=date.today(),
-            help="End date for data analysis",
-            key="home_end_date"
-        )
+    render_global_controls("home", today, in_columns=True)
 
     # Dashboard Description
     st.header("Dashboard Overview")
-    st.markdown("""
-    This dashboard provides comprehensive analysis of FDA data across multiple categories:
-
-    - **Devices**: Analysis of medical device events, including device class distribution, problems, and manufacturer analysis
-    - **Drugs**: Analysis of drug adverse events and safety data
-    - **Food**: Analysis of food recalls and safety data
-    - **Tobacco**: Analysis of tobacco product reports and safety data
-    - **Other**: Other FDA datasets including substance and NSDE data
-    - **Healthcare Trends**: AI-powered prediction of future healthcare trends based on FDA data
-    - **Correlation Analysis**: Cross-category analysis that identifies relationships between different data domains
-
-    Use the global controls above to adjust the data sampling and date range for all analyses.
-    Each tab features subtabs with specialized analyses and visualizations.
-    """)
+    st.markdown(OVERVIEW_MARKDOWN)
 
     # Display current settings
     st.subheader("Current Settings")
-    st.info(f"""
-    - Maximum Sample Size: {st.session_state.sample_size:,} records
-    - Top Results to Display: {st.session_state.top_n_results}
-    - Date Range: {st.session_state.start_date} to {st.session_state.end_date}
-    """)
+    st.info(_current_settings_text())
 
 def main():
     st.set_page_config(
@@ -97,65 +86,30 @@ def main():
         layout="wide"
     )
 
-    # Initializing session state variables if they don't exist
-    if "sample_size" not in st.session_state:
-        st.session_state.sample_size = 1000
-    if "top_n_results" not in st.session_state:
-        st.session_state.top_n_results = 10
-    if "start_date" not in st.session_state:
-        st.session_state.start_date = date(2020, 1, 1)
-    if "end_date" not in st.session_state:
-        st.session_state.end_date = date.today()
+    # Read the clock once per run, every date widget and default below shares it
+    today = date.today()
+
+    # Initializing session state defaults once per session, later runs only check the sentinel
+    if "_initialized" not in st.session_state:
+        defaults = {
+            "sample_size": 1000,
+            "top_n_results": 10,
+            "start_date": date(2020, 1, 1),
+            "end_date": today
+        }
+        for key, value in defaults.items():
+            st.session_state.setdefault(key, value)
+        st.session_state._initialized = True
 
     # Sidebar for global controls
     with st.sidebar:
         st.header("Global Controls")
 
-        # Sample size control
-        st.session_state.sample_size = st.slider(
-            "Maximum Sample Size",
-            min_value=100,
-            max_value=10000,
-            value=st.session_state.sample_size,
-            step=100,
-            help="Maximum number of records to fetch from the database",
-            key="sidebar_sample_size"
-        )
-
-        # Top N results control
-        st.session_state.top_n_results = st.slider(
-            "Top N Results",
-            min_value=5,
-            max_value=50,
-            value=st.session_state.top_n_results,
-            step=5,
-            help="Number of top results to display in charts and tables",
-            key="sidebar_top_n_results"
-        )
-
-        # Date range controls
-        st.session_state.start_date = st.date_input(
-            "Start Date",
-            value=st.session_state.start_date,
-            min_value=date(2018, 1, 1),
-            max_value=date.today(),
-            help="Start date for data analysis",
-            key="sidebar_start_date"
-        )
-
-        st.session_state.end_date = st.date_input(
-            "End Date",
-            value=st.session_state.end_date,
-            min_value=st.session_state.start_date,
-            max_value=date.today(),
-            help="End date for data analysis",
-            key="sidebar_end_date"
-        )
+        # Widgets in a form only rerun the app when Apply is pressed, not on every drag
+        render_global_controls("sidebar", today)
 
         st.subheader("Current Settings")
-        st.write(f"Sample Size: {st.session_state.sample_size:,} records")
-        st.write(f"Top N Results: {st.session_state.top_n_results}")
-        st.write(f"Date Range: {st.session_state.start_date} to {st.session_state.end_date}")
+        st.markdown(_current_settings_text())
 
         st.subheader("Data Source")
         st.write("All data is retrieved in real-time from the [OpenFDA API](https://open.fda.gov/apis/).")
@@ -173,40 +127,14 @@ def main():
     # Main content area
     st.title("Data Analysis Dashboard")
 
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
-        "Overview",
-        "Drug Reports",
-        "Device Reports",
-        "Food Reports",
-        "Tobacco Reports",
-        "Other Data",
-        "Healthcare Trends",
-        "Correlation Analysis"
-    ])
-
-    with tab1:
-        display_home()
-
-    with tab2:
-        display_drug_reports()
-
-    with tab3:
-        display_device_reports()
-
-    with tab4:
-        display_food_reports()
-
-    with tab5:
-        display_tobacco_reports()
-
-    with tab6:
-        display_other_data()
-
-    with tab7:
-        display_healthcare_trends()
-
-    with tab8:
-        display_correlation_analysis()
+    # Only the selected page's function runs on a rerun, and its module is imported the first
+    # time any session opens it
+    pages = [st.Page(lambda: display_home(today), title="Overview", url_path="overview", default=True)]
+    pages += [
+        st.Page(_page_runner(module_name, function_name), title=title, url_path=url_path)
+        for title, url_path, module_name, function_name in REPORT_PAGES
+    ]
+    st.navigation(pages).run()
 
 if __name__ == "__main__":
     main()
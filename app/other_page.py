@@ -1,13 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import google.generativeai as genai
 import os
 import sys
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.gemini import get_gemini_model
 from src.substance_endpoints import (
     get_substance_by_relationship_name,
     get_substance_by_moiety_name,
@@ -18,143 +19,239 @@ from src.substance_endpoints import (
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+if not GEMINI_API_KEY:
     st.warning("Gemini API key not found. AI insights will not be available.")
 
-def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str = None) -> str:
-    if not GEMINI_API_KEY or df.empty:
-        return "No data available for insights or API key not configured."
-
-    # Summarize the data for context
-    summary = df.head(10).to_string(index=False)
+def _is_transient(error: BaseException) -> bool:
+    # Only reached after a Gemini call failed, so the SDK is already loaded
+    from google.api_core import exceptions as google_exceptions
+
+    return isinstance(error, (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        TimeoutError
+    ))
+
+# Rate limits and timeouts usually clear within seconds; anything else fails straight away
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.5, max=4),
+    retry=retry_if_exception(_is_transient),
+    reraise=True
+)
+def _start_stream(model, prompt: str):
+    # The request is sent here, so rate limits surface before any text is shown
+    return model.generate_content(prompt, stream=True)
+
+def _summarize_for_prompt(df: pd.DataFrame, n: int = 10) -> str:
+    """Compact text form of a frame for a Gemini prompt"""
+    # Category counts read best as label: count pairs with the total and the leader's share
+    if len(df.columns) == 2 and df.columns[1] == "Count":
+        top = df.head(n)
+        total = df["Count"].sum()
+        lines = [f"{label}: {count}" for label, count in top.itertuples(index=False)]
+        if total:
+            lines.append(f"Total={total}, top share={top['Count'].iloc[0] / total:.1%}")
+        return "\n".join(lines)
+
+    # Anything else goes as CSV, far fewer tokens than padded to_string output;
+    # columns with no values carry nothing for the model
+    return df.head(n).dropna(axis=1, how="all").to_csv(index=False)
+
+def _insight_prompt(df: pd.DataFrame, context: str, custom_question: str = None) -> str:
+    summary = _summarize_for_prompt(df)
 
     if custom_question:
-        prompt = (
+        return (
             f"Given the following data about {context} in FDA substance/NSDE data:\n\n"
             f"{summary}\n\n"
             f"Answer this question in 3-5 sentences, focusing on data-driven insights:\n"
             f"{custom_question}"
         )
-    else:
-        prompt = (
-            f"Analyze the following data about {context} in FDA substance/NSDE data:\n\n"
-            f"{summary}\n\n"
-            "Provide a concise summary (3-5 sentences) of key patterns and notable findings. "
-            "Include any potential implications for healthcare or regulatory considerations."
-        )
+    return (
+        f"Analyze the following data about {context} in FDA substance/NSDE data:\n\n"
+        f"{summary}\n\n"
+        "Provide a concise summary (3-5 sentences) of key patterns and notable findings. "
+        "Include any potential implications for healthcare or regulatory considerations."
+    )
+
+def stream_insights_from_data(df: pd.DataFrame, context: str, custom_question: str = None):
+    """Yield the insight text as Gemini writes it, so the first words show up right away"""
+    # The key check and client setup are resolved once by the cached factory
+    model = get_gemini_model()
+    if model is None or df.empty:
+        yield "No data available for insights or API key not configured."
+        return
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+        for chunk in _start_stream(model, _insight_prompt(df, context, custom_question)):
+            yield chunk.text
     except Exception as e:
-        return f"Error generating insights: {e}"
+        yield f"Error generating insights: {e}"
+
+def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str = None) -> str:
+    return "".join(stream_insights_from_data(df, context, custom_question))
+
+# Gemini calls are network-bound, so "Generate all insights" overlaps them on a small pool
+_INSIGHTS_POOL = ThreadPoolExecutor(max_workers=5)
 
 def render_ai_insights_section(df, context, key_prefix):
     st.subheader("AI Insights")
     question = st.text_input("Custom question (optional)", key=f"{key_prefix}_question")
+    insights = st.session_state.setdefault("other_insights", {})
+
+    # Registered so the page-level button can request every section at once
+    st.session_state.other_insight_sections[key_prefix] = (df, context, question or "")
+
     if st.button("Generate Insights", key=f"{key_prefix}_insights"):
-        with st.spinner("Generating insights..."):
-            insights = get_insights_from_data(df, context, question or "")
-            st.write(insights)
+        insights[key_prefix] = st.write_stream(stream_insights_from_data(df, context, question or ""))
+    elif key_prefix in insights:
+        st.write(insights[key_prefix])
 
+def render_generate_all_insights():
+    sections = st.session_state.other_insight_sections
+    if not sections or not st.button("Generate all insights", key="other_all_insights"):
+        return
+
+    # Built on the script thread so the workers only read the cached instance
+    get_gemini_model()
+
+    with st.spinner("Generating insights..."):
+        futures = {
+            key_prefix: _INSIGHTS_POOL.submit(get_insights_from_data, df, context, question)
+            for key_prefix, (df, context, question) in sections.items()
+        }
+        st.session_state.other_insights.update((key, future.result()) for key, future in futures.items())
+    # Sections above were drawn before the results existed
+    st.rerun()
+
+# No animated transitions and no mode bar, these charts are only read
+_CHART_CONFIG = {"displayModeBar": False}
+
+# Figures are cached on the frame and labels, so reruns from widgets such as the moiety
+# search reuse them instead of repeating plotly.express validation
+@st.cache_data(ttl=3600, show_spinner=False)
+def _bar_figure(df: pd.DataFrame, x: str, title: str):
+    import plotly.express as px
+
+    fig = px.bar(df, x=x, y="Count", title=title, color=x, text="Count")
+    fig.update_layout(xaxis_tickangle=-45, transition_duration=0)
+    fig.update_traces(textposition='outside', marker_line_width=0)
+    return fig
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _bar_pie_figure(df: pd.DataFrame, label: str, bar_title: str, pie_title: str):
+    """Bar chart and its share pie side by side in one figure, so the section draws a single chart"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    # Each category gets the same colour in both charts, as px.bar(color=...) gave the bars before
+    palette = px.colors.qualitative.Plotly
+    colors = [palette[i % len(palette)] for i in range(len(df))]
+
+    fig = make_subplots(
+        rows=1, cols=2,
+        specs=[[{"type": "bar"}, {"type": "pie"}]],
+        subplot_titles=(bar_title, pie_title)
+    )
+    fig.add_trace(
+        go.Bar(x=df[label], y=df["Count"], text=df["Count"], textposition="outside",
+               marker_color=colors, marker_line_width=0, showlegend=False),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Pie(labels=df[label], values=df["Count"], hole=0.4, textposition="inside",
+               textinfo="percent+label", marker_colors=colors, marker_line_width=0),
+        row=1, col=2
+    )
+    fig.update_layout(xaxis_tickangle=-45, transition_duration=0)
+    return fig
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _treemap_figure(df: pd.DataFrame, path: str, title: str):
+    import plotly.express as px
+
+    fig = px.treemap(df, path=[path], values="Count", title=title)
+    fig.update_layout(transition_duration=0)
+    return fig
+
+def _top_counts(fetch) -> pd.DataFrame:
+    """The top_n_results largest categories from a count fetcher. openFDA count queries return
+    the largest buckets first, so only that many are requested instead of sample_size"""
+    limit = min(st.session_state.sample_size, st.session_state.top_n_results)
+    df = fetch(limit)
+    if df.empty:
+        return df
+
+    # The built-in fallback frames are not ordered by count; nlargest selects the
+    # top rows without sorting and copying the whole frame first
+    if not df["Count"].is_monotonic_decreasing:
+        df = df.nlargest(limit, "Count")
+    # Counts fit in int32, which halves that column in the Arrow payload st.dataframe sends.
+    # The label column holds one row per category, so a categorical would not shrink it
+    return df.head(limit).astype({"Count": "int32"})
+
+# Each section is a fragment, so its own widgets (moiety search, insight questions and
+# buttons) rerun only that section instead of the whole page
+@st.fragment
 def display_substance_relationship():
     st.subheader("Substance Data by Relationship")
 
-    # Get data with sample size limit
-    df = get_substance_by_relationship_name(st.session_state.sample_size)
+    # Only the top categories are requested
+    df = _top_counts(get_substance_by_relationship_name)
 
     if df.empty:
         st.warning("No relationship data available.")
         return
 
-    # Sort by count and limit to top N results
-    df = df.sort_values("Count", ascending=False).head(st.session_state.top_n_results)
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        # Bar chart
-        fig_bar = px.bar(
-            df,
-            x="Relationship",
-            y="Count",
-            title="Substance Relationships",
-            color="Relationship",
-            text="Count"
-        )
-        fig_bar.update_layout(xaxis_tickangle=-45)
-        fig_bar.update_traces(textposition='outside')
-        st.plotly_chart(fig_bar, use_container_width=True)
-
-    with col2:
-        # Pie chart
-        fig_pie = px.pie(
-            df,
-            values="Count",
-            names="Relationship",
-            title="Distribution of Substance Relationships",
-            hole=0.4
-        )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_pie, use_container_width=True)
+    # Bar and pie chart
+    fig = _bar_pie_figure(df, "Relationship", "Substance Relationships",
+                          "Distribution of Substance Relationships")
+    st.plotly_chart(fig, use_container_width=True, config=_CHART_CONFIG)
 
     with st.expander("View Relationship Data", expanded=False):
         st.dataframe(df, use_container_width=True, hide_index=True)
 
     render_ai_insights_section(df, "substance relationships", "relationship")
 
+@st.fragment
 def display_substance_moiety():
     st.subheader("Substance Data by Moiety")
 
-    df = get_substance_by_moiety_name(st.session_state.sample_size)
+    df = _top_counts(get_substance_by_moiety_name)
 
     if df.empty:
         st.warning("No moiety data available.")
         return
 
-    df = df.sort_values("Count", ascending=False).head(st.session_state.top_n_results)
-
     col1, col2 = st.columns(2)
 
     with col1:
         # Bar chart
-        fig_bar = px.bar(
-            df,
-            x="Moiety",
-            y="Count",
-            title="Substance Moieties",
-            color="Moiety",
-            text="Count"
-        )
-        fig_bar.update_layout(xaxis_tickangle=-45)
-        fig_bar.update_traces(textposition='outside')
-        st.plotly_chart(fig_bar, use_container_width=True)
+        fig_bar = _bar_figure(df, "Moiety", "Substance Moieties")
+        st.plotly_chart(fig_bar, use_container_width=True, config=_CHART_CONFIG)
 
     with col2:
         # Treemap
-        fig_treemap = px.treemap(
-            df,
-            path=["Moiety"],
-            values="Count",
-            title="Hierarchy of Substance Moieties"
-        )
-        st.plotly_chart(fig_treemap, use_container_width=True)
+        fig_treemap = _treemap_figure(df, "Moiety", "Hierarchy of Substance Moieties")
+        st.plotly_chart(fig_treemap, use_container_width=True, config=_CHART_CONFIG)
 
     # Moiety search
     st.subheader("Search for Moieties")
     search_term = st.text_input("Enter search term", key="moiety_search")
 
     if search_term:
-        filtered_df = df[df["Moiety"].str.contains(search_term, case=False)]
+        # Plain substring match: no regex compiled per search, and missing names never match
+        filtered_df = df[df["Moiety"].str.contains(search_term, case=False, regex=False, na=False)]
         st.dataframe(filtered_df, use_container_width=True, hide_index=True)
     else:
         st.dataframe(df, use_container_width=True, hide_index=True)
 
     render_ai_insights_section(df, "substance moieties", "moiety")
 
+@st.fragment
 def display_nsde_analysis():
     st.subheader("NSDE Data Analysis")
 
@@ -168,25 +265,13 @@ def display_nsde_analysis():
     with tab1:
         st.subheader("NSDE Data by Product Type")
 
-        df = get_nsde_by_product_type(st.session_state.sample_size)
+        df = _top_counts(get_nsde_by_product_type)
 
         if df.empty:
             st.warning("No product type data available.")
         else:
-            # Sort by count and limit to top N results
-            df = df.sort_values("Count", ascending=False).head(st.session_state.top_n_results)
-
-            fig = px.bar(
-                df,
-                x="Product Type",
-                y="Count",
-                title="NSDE Data by Product Type",
-                color="Product Type",
-                text="Count"
-            )
-            fig.update_layout(xaxis_tickangle=-45)
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
+            fig = _bar_figure(df, "Product Type", "NSDE Data by Product Type")
+            st.plotly_chart(fig, use_container_width=True, config=_CHART_CONFIG)
 
             st.dataframe(df, use_container_width=True, hide_index=True)
 
@@ -196,41 +281,15 @@ def display_nsde_analysis():
     with tab2:
         st.subheader("NSDE Data by Marketing Category")
 
-        df = get_nsde_by_marketing_category(st.session_state.sample_size)
+        df = _top_counts(get_nsde_by_marketing_category)
 
         if df.empty:
             st.warning("No marketing category data available.")
         else:
-            # Sort by count and limit to top N results
-            df = df.sort_values("Count", ascending=False).head(st.session_state.top_n_results)
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                # Bar chart
-                fig_bar = px.bar(
-                    df,
-                    x="Marketing Category",
-                    y="Count",
-                    title="NSDE Data by Marketing Category",
-                    color="Marketing Category",
-                    text="Count"
-                )
-                fig_bar.update_layout(xaxis_tickangle=-45)
-                fig_bar.update_traces(textposition='outside')
-                st.plotly_chart(fig_bar, use_container_width=True)
-
-            with col2:
-                # Pie chart
-                fig_pie = px.pie(
-                    df,
-                    values="Count",
-                    names="Marketing Category",
-                    title="Distribution of Marketing Categories",
-                    hole=0.4
-                )
-                fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_pie, use_container_width=True)
+            # Bar and pie chart
+            fig = _bar_pie_figure(df, "Marketing Category", "NSDE Data by Marketing Category",
+                                  "Distribution of Marketing Categories")
+            st.plotly_chart(fig, use_container_width=True, config=_CHART_CONFIG)
 
             st.dataframe(df, use_container_width=True, hide_index=True)
 
@@ -240,33 +299,48 @@ def display_nsde_analysis():
     with tab3:
         st.subheader("NSDE Data by Route of Administration")
 
-        df = get_nsde_by_route(st.session_state.sample_size)
+        df = _top_counts(get_nsde_by_route)
 
         if df.empty:
             st.warning("No route of administration data available.")
         else:
-            # Sort by count and limit to top N results
-            df = df.sort_values("Count", ascending=False).head(st.session_state.top_n_results)
-
-            fig = px.bar(
-                df,
-                x="Route",
-                y="Count",
-                title="NSDE Data by Route of Administration",
-                color="Route",
-                text="Count"
-            )
-            fig.update_layout(xaxis_tickangle=-45)
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
+            fig = _bar_figure(df, "Route", "NSDE Data by Route of Administration")
+            st.plotly_chart(fig, use_container_width=True, config=_CHART_CONFIG)
 
             st.dataframe(df, use_container_width=True, hide_index=True)
 
             render_ai_insights_section(df, "NSDE routes of administration", "nsde_route")
 
+# The count fetchers behind the page's sections, in the order they are drawn
+_PAGE_FETCHERS = (
+    get_substance_by_relationship_name,
+    get_substance_by_moiety_name,
+    get_nsde_by_product_type,
+    get_nsde_by_marketing_category,
+    get_nsde_by_route
+)
+
+def _prefetch_page_data():
+    """Warm every section's fetcher cache at once, so the first load waits for the slowest
+    endpoint rather than all five one after another"""
+    limit = min(st.session_state.sample_size, st.session_state.top_n_results)
+    if st.session_state.get("_other_prefetched") == limit:
+        return
+
+    # A failed fetch is not re-raised here, its section fetches again and reports it
+    with ThreadPoolExecutor(max_workers=len(_PAGE_FETCHERS)) as executor:
+        for fetch in _PAGE_FETCHERS:
+            executor.submit(fetch, limit)
+    st.session_state._other_prefetched = limit
+
 def display_other_data():
     st.title("Other FDA Data Analysis")
 
+    _prefetch_page_data()
+
+    # Filled by each insights section during this run
+    st.session_state.other_insight_sections = {}
+
     tab1, tab2 = st.tabs([
         "Substance Analysis",
         "NSDE Analysis"
@@ -283,3 +357,5 @@ def display_other_data():
 
     with tab2:
         display_nsde_analysis()
+
+    render_generate_all_insights()
@@ -3,13 +3,14 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date
-import google.generativeai as genai
 import os
 import sys
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.gemini import get_gemini_model
 from src.tobacco_endpoints import (
     get_tobacco_reports_by_product,
     get_tobacco_reports_by_problem_type,
@@ -20,11 +21,15 @@ from src.tobacco_endpoints import (
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+if not GEMINI_API_KEY:
     st.warning("Gemini API key not found. AI insights will not be available.")
 
+# Keyed on the full prompt (context, question and data summary), so asking the same thing again
+# is answered from memory. Failed calls raise and are not cached
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def _cached_generate(prompt: str) -> str:
+    return get_gemini_model().generate_content(prompt).text
+
 def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str = None) -> str:
     if not GEMINI_API_KEY or df.empty:
         return "No data available for insights or API key not configured."
@@ -58,9 +63,7 @@ def get_insights_from_data(df: pd.DataFrame, context: str, custom_question: str
         )
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+        return _cached_generate(prompt)
     except Exception as e:
         return f"Error generating insights: {e}"
 
@@ -72,6 +75,14 @@ def render_ai_insights_section(df, context, key_prefix):
             insights = get_insights_from_data(df, context, question or "")
             st.write(insights)
 
+def _top_with_other(df: pd.DataFrame, label: str, n: int = 10) -> pd.DataFrame:
+    """The n largest rows by Count, with the remainder summed into a single "Other" row"""
+    if len(df) <= n:
+        return df
+    top = df.nlargest(n, "Count")
+    rest = df["Count"].sum() - top["Count"].sum()
+    return pd.concat([top[[label, "Count"]], pd.DataFrame({label: ["Other"], "Count": [rest]})], ignore_index=True)
+
 def display_product_analysis():
     st.subheader("Analysis by Tobacco Product Type")
 
@@ -88,30 +99,50 @@ def display_product_analysis():
 
         col1, col2 = st.columns(2)
 
+        # Brand names that match no keyword become their own category, so the charts
+        # show the largest ones and fold the rest into "Other"
+        top_categories = category_df.nlargest(15, "Count")
+
+        # One colour per category, as px.bar(color=...) gave before, shared by the bar and the pie
+        palette = px.colors.qualitative.Plotly
+        category_colors = {
+            category: palette[i % len(palette)]
+            for i, category in enumerate(top_categories["Product Category"])
+        }
+
         with col1:
             # Bar chart for categories
-            fig_bar = px.bar(
-                category_df,
-                x="Product Category",
-                y="Count",
+            fig_bar = go.Figure(
+                go.Bar(
+                    x=top_categories["Product Category"].to_numpy(),
+                    y=top_categories["Count"].to_numpy(),
+                    text=top_categories["Count"].to_numpy(),
+                    textposition='outside',
+                    marker_color=[category_colors[c] for c in top_categories["Product Category"]]
+                )
+            )
+            fig_bar.update_layout(
                 title="Tobacco Reports by Product Category",
-                color="Product Category",
-                text="Count"
+                xaxis_title="Product Category",
+                yaxis_title="Count",
+                xaxis_tickangle=0
             )
-            fig_bar.update_layout(xaxis_tickangle=0)
-            fig_bar.update_traces(textposition='outside')
             st.plotly_chart(fig_bar, use_container_width=True)
 
         with col2:
             # Pie chart for categories
-            fig_pie = px.pie(
-                category_df,
-                values="Count",
-                names="Product Category",
-                title="Distribution of Tobacco Reports by Product Category",
-                hole=0.4
+            pie_df = _top_with_other(category_df, "Product Category")
+            fig_pie = go.Figure(
+                go.Pie(
+                    labels=pie_df["Product Category"].to_numpy(),
+                    values=pie_df["Count"].to_numpy(),
+                    hole=0.4,
+                    textposition='inside',
+                    textinfo='percent+label',
+                    marker_colors=[category_colors.get(c, "lightgray") for c in pie_df["Product Category"]]
+                )
             )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+            fig_pie.update_layout(title="Distribution of Tobacco Reports by Product Category")
             st.plotly_chart(fig_pie, use_container_width=True)
 
         # Local filtering
@@ -416,25 +447,29 @@ def display_time_analysis():
     if time_df.empty:
         st.warning(f"No time-based data available for the selected date range and {interval} interval.")
     else:
-        # time-series visualization
-        fig_time = px.line(
-            time_df,
-            x="Time Period",
-            y="Count",
-            title=f"Tobacco Reports Over Time (by {interval.capitalize()})",
-            markers=True
+        # time-series visualization, drawn with WebGL traces from plain arrays so long
+        # monthly ranges stay responsive without plotly.express rebuilding the frame
+        periods = time_df["Time Period"].to_numpy()
+        counts = time_df["Count"].to_numpy()
+        fig_time = go.Figure(
+            go.Scattergl(x=periods, y=counts, mode='lines+markers', name='Count')
         )
 
         # Add a trend line
         fig_time.add_trace(
-            go.Scatter(
-                x=time_df["Time Period"],
-                y=time_df["Count"].rolling(window=3, min_periods=1).mean(),
+            go.Scattergl(
+                x=periods,
+                y=time_df["Count"].rolling(window=3, min_periods=1).mean().to_numpy(),
                 mode='lines',
                 name='3-point Moving Average',
                 line=dict(color='red', dash='dash')
             )
         )
+        fig_time.update_layout(
+            title=f"Tobacco Reports Over Time (by {interval.capitalize()})",
+            xaxis_title="Time Period",
+            yaxis_title="Count"
+        )
 
         st.plotly_chart(fig_time, use_container_width=True)
 
@@ -473,9 +508,33 @@ def display_time_analysis():
 
         render_ai_insights_section(time_df, f"tobacco reports over time (by {interval})", "time")
 
+def _prefetch_tobacco_data():
+    """Start every tab's openFDA query at once so the first load waits for the slowest
+    endpoint instead of all six in turn; the tabs then read the warmed fetcher caches"""
+    start_date = st.session_state.start_date
+    end_date = st.session_state.end_date
+    sample_size = st.session_state.sample_size
+    interval = st.session_state.get("tobacco_time_interval", "year")
+
+    prefetch_key = (start_date, end_date, sample_size, interval)
+    if st.session_state.get("_tobacco_prefetched") == prefetch_key:
+        return
+
+    # A failed fetch is not re-raised here, its tab calls the fetcher again and reports it
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        executor.submit(get_tobacco_reports_by_product, start_date, end_date, sample_size)
+        executor.submit(get_tobacco_reports_by_problem_type, start_date, end_date, sample_size)
+        executor.submit(get_tobacco_reports_by_health_effect, start_date, end_date, sample_size)
+        executor.submit(get_tobacco_reports_by_demographic, "age", start_date, end_date, sample_size)
+        executor.submit(get_tobacco_reports_by_demographic, "gender", start_date, end_date, sample_size)
+        executor.submit(get_tobacco_reports_over_time, interval, start_date, end_date)
+    st.session_state._tobacco_prefetched = prefetch_key
+
 def display_tobacco_reports():
     st.title("Tobacco Data Analysis")
 
+    _prefetch_tobacco_data()
+
     tab1, tab2, tab3, tab4 = st.tabs([
         "Product Analysis",
         "Problem Type Analysis",
@@ -1,9 +1,91 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+from dataclasses import dataclass
 from datetime import date
 from typing import Tuple, Optional
 
+# Session state keys shared by every page, in Controls field order
+CONTROL_FIELDS = ("sample_size", "top_n_results", "start_date", "end_date")
+CONTROLS_MIN_DATE = date(2018, 1, 1)
+
+@dataclass(frozen=True)
+class Controls:
+    sample_size: int
+    top_n_results: int
+    start_date: date
+    end_date: date
+
+def current_controls() -> Controls:
+    return Controls(*(st.session_state[field] for field in CONTROL_FIELDS))
+
+def _share_controls(key_prefix: str) -> None:
+    """Copy one group's widget values to the shared settings and to every other group's widgets.
+    Runs as the Apply callback, before any widget of the next run exists, so all keys can be written"""
+    values = {field: st.session_state[f"{key_prefix}_{field}"] for field in CONTROL_FIELDS}
+    if values["end_date"] < values["start_date"]:
+        st.session_state[f"{key_prefix}_controls_error"] = "End date must be on or after the start date."
+        return
+
+    st.session_state.pop(f"{key_prefix}_controls_error", None)
+    for field, value in values.items():
+        st.session_state[field] = value
+        for prefix in st.session_state._control_prefixes:
+            if prefix != key_prefix:
+                st.session_state[f"{prefix}_{field}"] = value
+
+def render_global_controls(key_prefix: str, today: date, in_columns: bool = False) -> Controls:
+    """Sample size, top N and date range widgets bound to the shared settings.
+    They sit in a form, so changing several of them costs one rerun when Apply is pressed"""
+    st.session_state.setdefault("_control_prefixes", set()).add(key_prefix)
+    # Widgets start from the shared settings; after that the Apply callback keeps them in step
+    for field in CONTROL_FIELDS:
+        st.session_state.setdefault(f"{key_prefix}_{field}", st.session_state[field])
+
+    with st.form(f"{key_prefix}_controls", clear_on_submit=False):
+        if in_columns:
+            sampling_column, date_column = st.columns(2)
+            sampling_column.subheader("Data Sampling")
+            date_column.subheader("Date Range")
+        else:
+            sampling_column = date_column = st.container()
+
+        sampling_column.slider(
+            "Maximum Sample Size",
+            min_value=100,
+            max_value=10000,
+            step=100,
+            help="Maximum number of records to fetch for each query",
+            key=f"{key_prefix}_sample_size"
+        )
+        sampling_column.slider(
+            "Top N Results",
+            min_value=5,
+            max_value=50,
+            step=5,
+            help="Number of top results to show in charts and tables",
+            key=f"{key_prefix}_top_n_results"
+        )
+        date_column.date_input(
+            "Start Date",
+            min_value=CONTROLS_MIN_DATE,
+            max_value=today,
+            help="Start date for data analysis",
+            key=f"{key_prefix}_start_date"
+        )
+        date_column.date_input(
+            "End Date",
+            min_value=CONTROLS_MIN_DATE,
+            max_value=today,
+            help="End date for data analysis",
+            key=f"{key_prefix}_end_date"
+        )
+        st.form_submit_button("Apply", on_click=_share_controls, args=(key_prefix,))
+
+    error = st.session_state.get(f"{key_prefix}_controls_error")
+    if error:
+        st.error(error)
+    return current_controls()
+
 def render_metric_header(title: str, description: str) -> None:
     st.subheader(title)
     st.write(description)
@@ -58,6 +140,8 @@ def render_bar_chart(
     x_label: str,
     y_label: str
 ) -> None:
+    import plotly.express as px
+
     fig = px.bar(
         df,
         x=x_col,
@@ -75,6 +159,8 @@ def render_line_chart(
     x_label: str,
     y_label: str
 ) -> None:
+    import plotly.express as px
+
     fig = px.line(
         df,
         x=x_col,
@@ -3,14 +3,30 @@ import os
 from dotenv import load_dotenv
 from typing import Optional
 import json
+import threading
 import streamlit as st
 
+# orjson parses the large OpenFDA payloads much faster than the stdlib, but it stays optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 api_key = os.getenv("OPENFDA_API_KEY")
 print(f"API Key loaded: {'Yes' if api_key else 'No'}")
 
 BASE_URL = "https://api.fda.gov/"
 
+# requests.Session is not thread-safe, so each fetching thread gets its own keep-alive session
+_thread_local = threading.local()
+
+def _get_session() -> requests.Session:
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
 # Cache results for 1 hour
 @st.cache_data(ttl=3600)
 def fetch_api_data(endpoint: str, params: Optional[dict] = None) -> dict:
@@ -27,7 +43,7 @@ def fetch_api_data(endpoint: str, params: Optional[dict] = None) -> dict:
         print(f"\nFetching data for: {params or 'unknown context'}")
         print(f"Full URL: {full_url}")
 
-        response = requests.get(full_url)
+        response = _get_session().get(full_url)
         print(f"Response Status Code: {response.status_code}")
         print(f"Response Headers: {dict(response.headers)}")
 
@@ -40,7 +56,7 @@ def fetch_api_data(endpoint: str, params: Optional[dict] = None) -> dict:
 
         response.raise_for_status()
 
-        data = response.json()
+        data = orjson.loads(response.content) if orjson else response.json()
         if "error" in data:
             print(f"API Error in response body: {data['error']}")
             return {"results": []}
@@ -11,6 +11,12 @@ from functools import lru_cache
 from datetime import datetime, timedelta
 import logging
 
+# Optional faster decoder for worker responses, falls back to requests' json()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("openfda")
@@ -21,8 +27,11 @@ API_KEY = os.getenv("OPENFDA_API_KEY", "")
 
 # Cache control
 CACHE_TTL = 3600 # time to live = 1hr
+CACHE_MAX_ENTRIES = 256 # oldest responses are evicted past this, so memory stays bounded
 cache_data = {}
 cache_timestamps = {}
+# Fetchers run on several threads at once, so reads, inserts and evictions hold this lock
+cache_lock = threading.Lock()
 
 # Threading control
 MAX_THREADS = 5
@@ -54,6 +63,8 @@ class APIRateLimiter:
 rate_limiter = APIRateLimiter()
 
 def worker():
+    # Each worker keeps its own session so repeat requests reuse the open connection
+    session = requests.Session()
     while True:
         try:
             task = request_queue.get()
@@ -73,9 +84,9 @@ def worker():
                     params["api_key"] = API_KEY
 
                 logger.info(f"Fetching data from: {full_url}")
-                response = requests.get(full_url, params=params)
+                response = session.get(full_url, params=params)
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content) if orjson else response.json()
                 response_queue.put((cache_key, data))
 
             except Exception as e:
@@ -97,6 +108,29 @@ def start_workers():
 # Initialize worker threads
 start_workers()
 
+def _store_cached(cache_key: str, data: Dict, now: float) -> None:
+    with cache_lock:
+        # Re-inserting moves the key to the end, so the dicts stay ordered oldest first
+        cache_data.pop(cache_key, None)
+        cache_timestamps.pop(cache_key, None)
+        cache_data[cache_key] = data
+        cache_timestamps[cache_key] = now
+
+        # Expired entries go first, then the oldest ones if the cache is still over its size
+        while cache_timestamps:
+            oldest_key, timestamp = next(iter(cache_timestamps.items()))
+            if now - timestamp < CACHE_TTL and len(cache_data) <= CACHE_MAX_ENTRIES:
+                break
+            cache_data.pop(oldest_key, None)
+            cache_timestamps.pop(oldest_key, None)
+
+def _read_cached(cache_key: str, now: float) -> Optional[Dict]:
+    with cache_lock:
+        timestamp = cache_timestamps.get(cache_key)
+        if timestamp is not None and now - timestamp < CACHE_TTL:
+            return cache_data.get(cache_key)
+    return None
+
 def fetch_with_cache(endpoint: str, params: Optional[Dict] = None, force_refresh: bool = False) -> Dict:
     # Create a cache key from the endpoint and params
     params_str = json.dumps(params, sort_keys=True) if params else ""
@@ -104,11 +138,11 @@ def fetch_with_cache(endpoint: str, params: Optional[Dict] = None, force_refresh
 
     # Check if we have a valid cached response
     now = time.time()
-    if not force_refresh and cache_key in cache_data:
-        timestamp = cache_timestamps.get(cache_key, 0)
-        if now - timestamp < CACHE_TTL:
+    if not force_refresh:
+        cached = _read_cached(cache_key, now)
+        if cached is not None:
             logger.info(f"Cache hit for {cache_key}")
-            return cache_data[cache_key]
+            return cached
 
     # Queue the request
     request_queue.put((endpoint, params, cache_key))
@@ -119,8 +153,7 @@ def fetch_with_cache(endpoint: str, params: Optional[Dict] = None, force_refresh
             result_key, data = response_queue.get(timeout=30)
             if result_key == cache_key:
                 # Cache the result
-                cache_data[cache_key] = data
-                cache_timestamps[cache_key] = now
+                _store_cached(cache_key, data, now)
                 response_queue.task_done()
                 return data
             else:
@@ -213,6 +246,7 @@ def get_safe_limit(limit):
     return str(limit)
 
 def clear_cache():
-    cache_data.clear()
-    cache_timestamps.clear()
+    with cache_lock:
+        cache_data.clear()
+        cache_timestamps.clear()
     logger.info("Cache cleared")
@@ -11,6 +11,12 @@ from src.data_utils import (
 FOOD_ENFORCEMENT_ENDPOINT = "food/enforcement.json"
 FOOD_EVENT_ENDPOINT = "food/event.json"
 
+def _compact_counts(df: pd.DataFrame, dtype: str = "int32") -> pd.DataFrame:
+    """Narrow the Count column, record counts never come close to the int64 range"""
+    if "Count" in df.columns:
+        return df.astype({"Count": dtype})
+    return df
+
 @st.cache_data(ttl=3600)
 def get_food_recalls_by_classification(start_date=None, end_date=None, limit: int = 100) -> pd.DataFrame:
     search_params = {"limit": str(min(limit, 100))}
@@ -49,7 +55,7 @@ def get_food_recalls_by_classification(start_date=None, end_date=None, limit: in
 
     df["Description"] = df["Classification"].map(classification_descriptions)
 
-    return df
+    return _compact_counts(df)
 
 @st.cache_data(ttl=3600)
 def get_food_recalls_by_state(start_date=None, end_date=None, limit: int = 100) -> pd.DataFrame:
@@ -86,7 +92,8 @@ def get_food_recalls_by_state(start_date=None, end_date=None, limit: int = 100)
     ]
     df = df[df["State"].isin(us_states)]
 
-    return df.sort_values("Count", ascending=False)
+    # Per-state counts are bounded by the request limit, so uint16 is plenty
+    return _compact_counts(df.sort_values("Count", ascending=False), "uint16")
 
 @st.cache_data(ttl=3600)
 def get_food_recalls_by_reason(start_date=None, end_date=None, limit: int = 100) -> Dict[str, pd.DataFrame]:
@@ -153,8 +160,8 @@ def get_food_recalls_by_reason(start_date=None, end_date=None, limit: int = 100)
         detailed_df = detailed_df.groupby(["Category", "Reason"]).sum().reset_index()
 
     return {
-        "categorized": categorized_df.sort_values("Count", ascending=False),
-        "detailed": detailed_df.sort_values(["Category", "Count"], ascending=[True, False])
+        "categorized": _compact_counts(categorized_df.sort_values("Count", ascending=False)),
+        "detailed": _compact_counts(detailed_df.sort_values(["Category", "Count"], ascending=[True, False]))
     }
 
 @st.cache_data(ttl=3600)
@@ -216,7 +223,7 @@ def get_food_recalls_by_product_type(start_date=None, end_date=None, limit: int
     if not df.empty:
         df = df.groupby("Product Category").sum().reset_index()
 
-    return df.sort_values("Count", ascending=False)
+    return _compact_counts(df.sort_values("Count", ascending=False))
 
 @st.cache_data(ttl=3600)
 def get_food_events_by_product(start_date=None, end_date=None, limit: int = 100) -> pd.DataFrame:
@@ -244,7 +251,7 @@ def get_food_events_by_product(start_date=None, end_date=None, limit: int = 100)
         for product, count in products.items()
     ])
 
-    return df.sort_values("Count", ascending=False)
+    return _compact_counts(df.sort_values("Count", ascending=False))
 
 @st.cache_data(ttl=3600)
 def get_food_events_by_industry(start_date=None, end_date=None, limit: int = 100) -> pd.DataFrame:
@@ -273,7 +280,7 @@ def get_food_events_by_industry(start_date=None, end_date=None, limit: int = 100
         for industry, count in industries.items()
     ])
 
-    return df.sort_values("Count", ascending=False)
+    return _compact_counts(df.sort_values("Count", ascending=False))
 
 @st.cache_data(ttl=3600)
 def get_food_events_by_symptom(start_date=None, end_date=None, limit: int = 100) -> Dict[str, pd.DataFrame]:
@@ -325,8 +332,8 @@ def get_food_events_by_symptom(start_date=None, end_date=None, limit: int = 100)
     categorized_df = detailed_df.groupby("Category")["Count"].sum().reset_index()
 
     return {
-        "categorized": categorized_df.sort_values("Count", ascending=False),
-        "detailed": detailed_df.sort_values(["Category", "Count"], ascending=[True, False])
+        "categorized": _compact_counts(categorized_df.sort_values("Count", ascending=False)),
+        "detailed": _compact_counts(detailed_df.sort_values(["Category", "Count"], ascending=[True, False]))
     }
 
 @st.cache_data(ttl=3600)
@@ -376,7 +383,7 @@ def get_food_events_by_age(start_date=None, end_date=None, limit: int = 100) ->
         if count > 0
     ])
 
-    return df.sort_values("Age Group")
+    return _compact_counts(df.sort_values("Age Group"))
 
 @st.cache_data(ttl=3600)
 def get_food_events_over_time(interval="month", start_date=None, end_date=None, limit: int = 100) -> pd.DataFrame:
@@ -425,7 +432,7 @@ def get_food_events_over_time(interval="month", start_date=None, end_date=None,
     else:  # month
         df = df.sort_values("Date")
 
-    return df
+    return _compact_counts(df)
 
 @st.cache_data(ttl=3600)
 def get_food_events_by_outcome(start_date=None, end_date=None, limit: int = 100) -> pd.DataFrame:
@@ -452,7 +459,7 @@ def get_food_events_by_outcome(start_date=None, end_date=None, limit: int = 100)
         for outcome, count in outcomes.items()
     ])
 
-    return df.sort_values("Count", ascending=False)
+    return _compact_counts(df.sort_values("Count", ascending=False))
 
 @st.cache_data(ttl=3600)
 def get_food_recall_trends(start_year=2018, end_year=2023) -> pd.DataFrame:
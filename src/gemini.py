@@ -0,0 +1,15 @@
+import os
+
+import streamlit as st
+
+@st.cache_resource(show_spinner=False)
+def get_gemini_model(name: str = "gemini-1.5-flash"):
+    """One client per model name, shared by every page and session, or None without an API key.
+    The SDK is only imported and configured the first time insights are generated"""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(name)
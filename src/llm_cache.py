@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("openfda")
+
+# Kept inside the project unless FDA_CACHE_PATH points somewhere else
+CACHE_PATH_ENV = "FDA_CACHE_PATH"
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "gemini_responses.db"
+
+def cache_path() -> Path:
+    """Location of the response database, read when the cache is first opened so a .env loaded later still applies"""
+    return Path(os.getenv(CACHE_PATH_ENV) or DEFAULT_CACHE_PATH)
+
+def prompt_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class SemanticCache:
+    """LLM responses stored in SQLite, found by exact prompt hash or by a similar question in the same scope.
+    The database is opened on first use; if it can't be opened the cache stays empty instead of failing"""
+
+    def __init__(self, path=None, threshold: float = 0.92, ttl: int = 86400):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = None
+        self.disabled = False
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # Called with the lock held
+        if self.conn is None and not self.disabled:
+            if self.path is None:
+                self.path = cache_path()
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, scope TEXT, embedding BLOB, response TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS responses_scope ON responses (scope)")
+                conn.commit()
+                self.conn = conn
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Response cache unavailable at {self.path}: {e}")
+                self.disabled = True
+        return self.conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def find_similar(self, scope: str, embedding: Sequence[float]) -> Optional[str]:
+        query = _unit(embedding)
+        with self.lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            rows = conn.execute(
+                "SELECT embedding, response FROM responses WHERE scope = ? AND embedding IS NOT NULL AND created > ?",
+                (scope, time.time() - self.ttl)
+            ).fetchall()
+        # Embeddings stored by a different model have another length and can't be compared
+        rows = [row for row in rows if len(row[0]) == query.nbytes]
+        if not rows:
+            return None
+
+        # Stored embeddings are unit length, so a dot product is the cosine similarity
+        matrix = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+        scores = matrix @ query
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+
+        logger.info(f"Semantic cache hit in {scope} (similarity {scores[best]:.3f})")
+        return rows[best][1]
+
+    def set(self, key: str, response: str, scope: Optional[str] = None,
+            embedding: Optional[Sequence[float]] = None):
+        blob = _unit(embedding).tobytes() if embedding is not None else None
+        now = time.time()
+        with self.lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, embedding, response, created) VALUES (?, ?, ?, ?, ?)",
+                (key, scope, blob, response, now)
+            )
+            # Expired rows are never read again, so each write drops them to keep the file bounded
+            conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+            conn.commit()
+
+def _unit(embedding: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector